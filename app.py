@@ -1,10 +1,17 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, session, Response, stream_with_context, send_from_directory, abort
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, session, Response, stream_with_context, send_from_directory, abort, make_response
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
-from user_manager import UserManager
+from user_manager import create_user_manager
+import backups
+import live
+import notify_bus
 import todo_db
+import atexit
 import os
 import queue
+import signal
+import sys
 import threading
+import time
 from functools import wraps
 
 app = Flask(__name__)
@@ -17,52 +24,218 @@ login_manager.login_view = 'login'
 login_manager.login_message = 'Please log in to access your todo list.'
 login_manager.login_message_category = 'info'
 
-# Initialize user manager
-user_manager = UserManager()
+# Initialize user manager; unsaved logins are written by shutdown()
+user_manager = create_user_manager()
 
-# Ensure each existing user has a DB (create schema + migrate from txt if needed)
-for _username in user_manager.users:
-    _db_path = user_manager.get_user_db_path(_username)
-    if not todo_db.has_tasks(_db_path):
-        _txt_file = user_manager.get_user_todo_file(_username)
-        if os.path.exists(_txt_file):
-            todo_db.migrate_from_file(_db_path, _txt_file)
+# User DBs are created (schema + migration from txt if needed) on each
+# user's first request rather than at startup; see _user_db_path.
+_ready_dbs = set()
+_init_locks = {}
+_init_locks_lock = threading.Lock()
+
+
+def _init_user_db(username: str, db_path: str) -> None:
+    if not todo_db.has_tasks(db_path):
+        txt_file = user_manager.get_user_todo_file(username)
+        if os.path.exists(txt_file):
+            todo_db.migrate_from_file(db_path, txt_file, progress=_log_import_progress)
         else:
-            todo_db.create_sample_tasks(_db_path)
+            todo_db.create_sample_tasks(db_path)
     else:
-        todo_db.ensure_db(_db_path)
+        todo_db.ensure_db(db_path)
+
+
+def _user_db_path(username: str) -> str:
+    """Path of a user's DB, creating or migrating it on first use.
+
+    A per-user lock makes concurrent first requests (and the warm-up)
+    initialize each DB once; later calls only check a set.
+    """
+    db_path = user_manager.get_user_db_path(username)
+    if db_path in _ready_dbs:
+        return db_path
+    with _init_locks_lock:
+        lock = _init_locks.setdefault(username, threading.Lock())
+    with lock:
+        if db_path not in _ready_dbs:
+            _init_user_db(username, db_path)
+            _ready_dbs.add(db_path)
+        with _init_locks_lock:
+            _init_locks.pop(username, None)
+    return db_path
+
+
+def _warm_up_user_dbs(workers: int) -> None:
+    """Initialize every user's DB from a pool of daemon threads.
+
+    Runs in the background so the app serves requests meanwhile; a
+    request for a user not reached yet initializes that DB itself.
+    """
+    pending = queue.Queue()
+    for username in user_manager.usernames():
+        pending.put(username)
+    total = pending.qsize()
+    started = time.monotonic()
+
+    def work():
+        while True:
+            try:
+                username = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                _user_db_path(username)
+            except Exception:
+                app.logger.exception('Failed to initialize the database of %s', username)
+
+    threads = [threading.Thread(target=work, name=f'db-warmup-{n}', daemon=True)
+               for n in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    app.logger.info('Warmed up %d user databases in %.1fs', total, time.monotonic() - started)
 
 _backup_dir = os.path.join(user_manager.todo_dir, 'backups')
 
-# SSE client queues — one per connected browser tab
-_sse_clients = []
-_sse_lock = threading.Lock()
+# Backups are written off the request thread, coalescing bursts of writes
+_backup_worker = backups.BackupWorker(
+    _backup_dir, debounce=float(os.environ.get('TODO_BACKUP_DEBOUNCE', '2'))
+)
+
+# Opt-in periodic SQLite snapshots (tasks, tags and journal) with
+# hourly/daily/weekly retention; off unless TODO_SNAPSHOT_INTERVAL is set
+_snapshot_interval = float(os.environ.get('TODO_SNAPSHOT_INTERVAL', '0'))
+if _snapshot_interval > 0:
+    _snapshot_scheduler = backups.SnapshotScheduler(
+        lambda: [user_manager.get_user_db_path(u) for u in user_manager.usernames()],
+        os.path.join(_backup_dir, 'snapshots'),
+        interval=_snapshot_interval,
+        compress=os.environ.get('TODO_SNAPSHOT_COMPRESS', '0') == '1',
+        retention=tuple(int(n) for n in os.environ.get('TODO_SNAPSHOT_KEEP', '24,7,4').split(',')),
+    )
+    _snapshot_scheduler.start()
 
+# Optionally initialize all user DBs ahead of their first request, in the
+# background so startup time does not grow with the number of users
+_warmup_workers = int(os.environ.get('TODO_DB_WARMUP_WORKERS', '0'))
+if _warmup_workers > 0:
+    threading.Thread(target=_warm_up_user_dbs, args=(_warmup_workers,),
+                     name='db-warmup', daemon=True).start()
 
-def _notify_clients():
-    """Push an update event to all connected SSE clients."""
-    dead = []
-    with _sse_lock:
-        clients = list(_sse_clients)
-    for q in clients:
-        try:
-            q.put_nowait("update")
-        except queue.Full:
-            dead.append(q)
-    if dead:
-        with _sse_lock:
-            for q in dead:
-                if q in _sse_clients:
-                    _sse_clients.remove(q)
+# Rows rendered per page on the dashboard; more are fetched on scroll
+_INDEX_PAGE_SIZE = 100
 
+# SSE streams, one queue per connected browser tab, grouped by username
+_sse_channels = live.SseChannels()
 
-def _backup_and_notify(tdb: todo_db.TodoDb) -> None:
-    """Write a dated backup snapshot then push SSE update to all clients."""
+
+def _request_username() -> str:
+    """Username of the session or API caller of the current request."""
+    user = getattr(request, 'authenticated_user', None) or current_user
+    return user.username
+
+
+def _deliver_update(username: str, revision: int) -> None:
+    """Bus handler: send a user's new changes to their tabs in this process."""
+    if not _sse_channels.subscriber_count(username):
+        return
+    tdb = todo_db.TodoDb(user_manager.get_user_db_path(username))
+    _sse_channels.publish(username, lambda since: live.change_event(tdb, since))
+
+
+# Carries "user changed" notices to every worker process (see notify_bus)
+_notify_bus = notify_bus.create_bus(os.environ.get('TODO_NOTIFY_BUS', ''), user_manager.todo_dir)
+_notify_bus.start(_deliver_update)
+atexit.register(_notify_bus.stop)
+
+
+def _notify_clients(tdb: todo_db.TodoDb) -> None:
+    """Tell every process's streams for the current user about the change."""
     try:
-        todo_db.write_backup(tdb.db_path, _backup_dir)
+        _notify_bus.publish(_request_username(), tdb.revision)
     except Exception:
-        pass  # backup failure must never break a write operation
-    _notify_clients()
+        # The write already committed; a missed event must not fail it.
+        app.logger.exception('Failed to publish live update')
+
+
+def _backup_and_notify(tdb: todo_db.TodoDb) -> None:
+    """Schedule a dated backup snapshot then push SSE deltas to the user's tabs."""
+    _backup_worker.schedule(tdb.db_path)
+    _notify_clients(tdb)
+
+
+def _conditional_response(tdb: todo_db.TodoDb, build):
+    """Answer 304 if the client's ETag matches the DB revision, else build().
+
+    Only the revision is read for a match, so unchanged polls never touch
+    the task tables.  X-Revision carries the revision the response is at
+    least as new as, for use with /api/v2/changes.
+    """
+    revision = tdb.revision
+    etag = tdb.etag(revision)
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    response.headers['X-Revision'] = str(revision)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.update(('Cookie', 'Authorization'))
+    return response
+
+
+def _wants_json() -> bool:
+    """True when a form route is called from script (fetch/XHR) rather than a page."""
+    if request.headers.get('X-Requested-With'):
+        return True
+    return request.accept_mimetypes.best_match(('text/html', 'application/json')) == 'application/json'
+
+
+def _form_error(message: str, status: int = 400, endpoint: str = 'index', **values):
+    """Report a failed form action: JSON for scripts, flash and redirect for pages."""
+    if _wants_json():
+        return jsonify({'error': message}), status
+    flash(message, 'error')
+    return redirect(url_for(endpoint, **values))
+
+
+def _form_success(tdb: todo_db.TodoDb, message: str, body=None, status: int = 200,
+                  category: str = 'success'):
+    """Report a completed form action.
+
+    Scripts get ``body`` plus the new revision as JSON (204 without a body)
+    and nothing is rendered; pages get a flash and a redirect to the index.
+    """
+    if _wants_json():
+        revision = tdb.revision
+        if body is None:
+            response = make_response('', 204)
+        else:
+            response = jsonify({**body, 'revision': revision})
+            response.status_code = status
+        response.headers['X-Revision'] = str(revision)
+        return response
+    flash(message, category)
+    return redirect(url_for('index'))
+
+
+def _log_import_progress(done: int, total: int) -> None:
+    """Progress callback for bulk todo.txt imports."""
+    app.logger.info('Imported %d/%d tasks', done, total)
+
+
+@app.before_request
+def _begin_db_request():
+    """Hold one pooled reader connection per user DB for the whole request."""
+    todo_db.begin_request()
+
+
+@app.teardown_request
+def _end_db_request(exc):
+    todo_db.end_request()
 
 
 @login_manager.user_loader
@@ -72,23 +245,33 @@ def load_user(username):
 def get_user_todo_db():
     """Get TodoDb instance for the current logged-in user."""
     if current_user.is_authenticated:
-        db_path = user_manager.get_user_db_path(current_user.username)
+        db_path = _user_db_path(current_user.username)
         return todo_db.TodoDb(db_path)
     return None
 
+def _api_request_user():
+    """User of a Bearer token or basic auth (password or token) on this request"""
+    auth = request.authorization
+    if not auth:
+        return None
+    if auth.type == 'bearer':
+        return user_manager.verify_token(auth.token)
+    if not auth.username or not auth.password:
+        return None
+    return user_manager.verify_credentials(auth.username, auth.password)
+
 def basic_auth_required(f):
-    """Decorator for basic authentication"""
+    """Decorator for basic (or API token) authentication"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        auth = request.authorization
-        if not auth or not auth.username or not auth.password:
+        if not request.authorization:
             return Response(
                 'Authentication required',
                 401,
                 {'WWW-Authenticate': 'Basic realm="Todo API"'}
             )
 
-        user = user_manager.authenticate_user(auth.username, auth.password)
+        user = _api_request_user()
         if not user:
             return Response(
                 'Invalid credentials',
@@ -101,10 +284,21 @@ def basic_auth_required(f):
 
     return decorated_function
 
+def api_auth_required(f):
+    """Decorator for /api/v2: accept a logged-in session, an API token or HTTP basic auth."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if current_user.is_authenticated:
+            request.authenticated_user = current_user
+            return f(*args, **kwargs)
+        return basic_auth_required(f)(*args, **kwargs)
+
+    return decorated_function
+
 def get_api_user_todo_db():
     """Get TodoDb instance for the API-authenticated user."""
     if hasattr(request, 'authenticated_user'):
-        db_path = user_manager.get_user_db_path(request.authenticated_user.username)
+        db_path = _user_db_path(request.authenticated_user.username)
         return todo_db.TodoDb(db_path)
     return None
 
@@ -155,8 +349,7 @@ def register():
 
         user, message = user_manager.create_user(username, email, password)
         if user:
-            db_path = user_manager.get_user_db_path(username)
-            todo_db.create_sample_tasks(db_path)
+            _user_db_path(username)
             flash(message, 'success')
             flash('You can now log in with your credentials.', 'info')
             return redirect(url_for('login'))
@@ -188,28 +381,31 @@ def index():
     if not tdb:
         flash('Error accessing your todo list.', 'error')
         return redirect(url_for('logout'))
+    # Read before the tasks so live updates never skip a change
+    revision = tdb.revision
+
+    try:
+        filtered_tasks, next_cursor = tdb.get_filtered_page(
+            search_term, priority_filter, project_filter, context_filter, completed_filter,
+            limit=_INDEX_PAGE_SIZE, after=request.args.get('after') or None,
+        )
+    except ValueError:
+        abort(400)
+
+    if request.args.get('partial'):
+        # Infinite scroll: just the next batch of table rows
+        response = make_response(render_template('task_rows.html', tasks=filtered_tasks))
+        response.headers['X-Next-Cursor'] = next_cursor or ''
+        return response
 
-    filtered_tasks = tdb.get_filtered_tasks(
-        search_term, priority_filter, project_filter, context_filter, completed_filter
-    )
     all_projects = tdb.get_all_projects()
     all_contexts = tdb.get_all_contexts()
 
-    all_tasks = tdb.tasks
-    total_tasks = len(all_tasks)
-    completed_tasks = sum(1 for t in all_tasks if t.completed)
-    incomplete_tasks = total_tasks - completed_tasks
-
-    priority_counts = {'A': 0, 'B': 0, 'C': 0, 'None': 0}
-    for task in all_tasks:
-        if not task.completed:
-            if task.priority:
-                priority_counts[task.priority] = priority_counts.get(task.priority, 0) + 1
-            else:
-                priority_counts['None'] += 1
+    stats = tdb.get_stats()
 
     return render_template('index.html',
                          tasks=filtered_tasks,
+                         next_cursor=next_cursor,
                          all_projects=all_projects,
                          all_contexts=all_contexts,
                          current_filters={
@@ -219,12 +415,8 @@ def index():
                              'context': context_filter,
                              'completed': completed_filter
                          },
-                         stats={
-                             'total': total_tasks,
-                             'completed': completed_tasks,
-                             'incomplete': incomplete_tasks,
-                             'priorities': priority_counts
-                         })
+                         stats=stats,
+                         revision=revision)
 
 @app.route('/add', methods=['GET', 'POST'])
 @login_required
@@ -232,8 +424,7 @@ def add_task():
     """Add a new task"""
     tdb = get_user_todo_db()
     if not tdb:
-        flash('Error accessing your todo list.', 'error')
-        return redirect(url_for('index'))
+        return _form_error('Error accessing your todo list.', 500)
 
     if request.method == 'POST':
         description = request.form.get('description', '').strip()
@@ -242,25 +433,23 @@ def add_task():
         contexts_str = request.form.get('contexts', '')
 
         if not description:
-            flash('Task description is required!', 'error')
-            return redirect(url_for('add_task'))
+            return _form_error('Task description is required!', endpoint='add_task')
 
         projects = [p.strip() for p in projects_str.split(',') if p.strip()]
         contexts = [c.strip() for c in contexts_str.split(',') if c.strip()]
 
         try:
-            tdb.add_task(
+            task = tdb.add_task(
                 description=description,
                 priority=priority if priority else None,
                 projects=projects if projects else None,
                 contexts=contexts if contexts else None
             )
             _backup_and_notify(tdb)
-            flash('Task added successfully!', 'success')
-            return redirect(url_for('index'))
+            return _form_success(tdb, 'Task added successfully!',
+                                 {'task': live.task_json(task.line_number, task)}, 201)
         except Exception as e:
-            flash(f'Error adding task: {str(e)}', 'error')
-            return redirect(url_for('add_task'))
+            return _form_error(f'Error adding task: {str(e)}', 500, endpoint='add_task')
 
     all_projects = tdb.get_all_projects()
     all_contexts = tdb.get_all_contexts()
@@ -275,13 +464,11 @@ def edit_task(task_id):
     """Edit an existing task"""
     tdb = get_user_todo_db()
     if not tdb:
-        flash('Error accessing your todo list.', 'error')
-        return redirect(url_for('index'))
+        return _form_error('Error accessing your todo list.', 500)
 
     task = tdb.get_task(task_id)
     if not task:
-        flash('Task not found!', 'error')
-        return redirect(url_for('index'))
+        return _form_error('Task not found!', 404)
 
     if request.method == 'POST':
         description = request.form.get('description', '').strip()
@@ -290,8 +477,8 @@ def edit_task(task_id):
         contexts_str = request.form.get('contexts', '')
 
         if not description:
-            flash('Task description is required!', 'error')
-            return redirect(url_for('edit_task', task_id=task_id))
+            return _form_error('Task description is required!',
+                               endpoint='edit_task', task_id=task_id)
 
         projects = [p.strip() for p in projects_str.split(',') if p.strip()]
         contexts = [c.strip() for c in contexts_str.split(',') if c.strip()]
@@ -305,11 +492,11 @@ def edit_task(task_id):
                 contexts=contexts if contexts else None
             )
             _backup_and_notify(tdb)
-            flash('Task updated successfully!', 'success')
-            return redirect(url_for('index'))
+            return _form_success(tdb, 'Task updated successfully!',
+                                 {'task': live.task_json(task_id, tdb.get_task(task_id))})
         except Exception as e:
-            flash(f'Error updating task: {str(e)}', 'error')
-            return redirect(url_for('edit_task', task_id=task_id))
+            return _form_error(f'Error updating task: {str(e)}', 500,
+                               endpoint='edit_task', task_id=task_id)
 
     all_projects = tdb.get_all_projects()
     all_contexts = tdb.get_all_contexts()
@@ -330,27 +517,24 @@ def complete_task(task_id):
     """Toggle task completion status"""
     tdb = get_user_todo_db()
     if not tdb:
-        flash('Error accessing your todo list.', 'error')
-        return redirect(url_for('index'))
+        return _form_error('Error accessing your todo list.', 500)
 
     task = tdb.get_task(task_id)
     if not task:
-        flash('Task not found!', 'error')
-        return redirect(url_for('index'))
+        return _form_error('Task not found!', 404)
 
     try:
         if task.completed:
             tdb.uncomplete_task(task_id)
-            flash('Task marked as incomplete!', 'success')
+            message = 'Task marked as incomplete!'
         else:
             tdb.complete_task(task_id)
-            flash('Task completed!', 'success')
+            message = 'Task completed!'
     except Exception as e:
-        flash(f'Error updating task: {str(e)}', 'error')
-    else:
-        _backup_and_notify(tdb)
+        return _form_error(f'Error updating task: {str(e)}', 500)
 
-    return redirect(url_for('index'))
+    _backup_and_notify(tdb)
+    return _form_success(tdb, message, {'task': live.task_json(task_id, tdb.get_task(task_id))})
 
 @app.route('/delete/<int:task_id>')
 @login_required
@@ -358,19 +542,16 @@ def delete_task(task_id):
     """Delete a task"""
     tdb = get_user_todo_db()
     if not tdb:
-        flash('Error accessing your todo list.', 'error')
-        return redirect(url_for('index'))
+        return _form_error('Error accessing your todo list.', 500)
 
     try:
         if not tdb.delete_task(task_id):
-            flash('Task not found!', 'error')
-        else:
-            _backup_and_notify(tdb)
-            flash('Task deleted successfully!', 'success')
+            return _form_error('Task not found!', 404)
     except Exception as e:
-        flash(f'Error deleting task: {str(e)}', 'error')
+        return _form_error(f'Error deleting task: {str(e)}', 500)
 
-    return redirect(url_for('index'))
+    _backup_and_notify(tdb)
+    return _form_success(tdb, 'Task deleted successfully!')
 
 @app.route('/api/search')
 @login_required
@@ -380,33 +561,41 @@ def api_search():
     if not tdb:
         return jsonify({'error': 'Error accessing todo list'}), 500
 
+    return _conditional_response(tdb, lambda: _task_list_json(tdb))
+
+
+def _task_list_json(tdb: todo_db.TodoDb):
+    """Filtered, paginated task list from the request args (/api/search, /api/v2/tasks)."""
     search_term = request.args.get('q', '')
     priority_filter = request.args.get('priority', 'all')
     project_filter = request.args.get('project', 'all')
     context_filter = request.args.get('context', 'all')
     completed_filter = request.args.get('completed', 'all')
+    order = 'rank' if request.args.get('sort') == 'rank' else 'default'
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
 
-    filtered_tasks = tdb.get_filtered_tasks(
-        search_term, priority_filter, project_filter, context_filter, completed_filter
-    )
+    try:
+        filtered_tasks, next_cursor = tdb.get_filtered_page(
+            search_term, priority_filter, project_filter, context_filter, completed_filter,
+            order=order, limit=limit, after=request.args.get('after') or None,
+        )
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
 
     tasks_data = []
     for task_id, task in filtered_tasks:
-        tasks_data.append({
-            'id': task_id,
-            'description': task.get_clean_description(),
-            'completed': task.completed,
-            'priority': task.priority,
-            'projects': task.projects,
-            'contexts': task.contexts,
-            'creation_date': task.creation_date,
-            'completion_date': task.completion_date,
-            'raw_line': task.raw_line
-        })
+        task_data = live.task_json(task_id, task)
+        if task.search_snippet is not None:
+            task_data['rank'] = task.search_rank
+            task_data['snippet'] = task.search_snippet
+        tasks_data.append(task_data)
 
     return jsonify({
         'tasks': tasks_data,
-        'count': len(tasks_data)
+        'count': len(tasks_data),
+        'next_cursor': next_cursor
     })
 
 @app.route('/bulk_action', methods=['POST'])
@@ -415,46 +604,41 @@ def bulk_action():
     """Handle bulk actions on multiple tasks"""
     tdb = get_user_todo_db()
     if not tdb:
-        flash('Error accessing your todo list.', 'error')
-        return redirect(url_for('index'))
+        return _form_error('Error accessing your todo list.', 500)
 
     action = request.form.get('action')
     task_ids = request.form.getlist('task_ids')
 
     if not task_ids:
-        flash('No tasks selected!', 'error')
-        return redirect(url_for('index'))
+        return _form_error('No tasks selected!')
 
     try:
         task_ids = [int(tid) for tid in task_ids]
     except ValueError:
-        flash('Invalid task IDs!', 'error')
-        return redirect(url_for('index'))
+        return _form_error('Invalid task IDs!')
 
-    success_count = 0
-    error_count = 0
-
-    for task_id in task_ids:
-        try:
-            if action == 'complete':
-                if tdb.complete_task(task_id):
-                    success_count += 1
-            elif action == 'uncomplete':
-                if tdb.uncomplete_task(task_id):
-                    success_count += 1
-            elif action == 'delete':
-                if tdb.delete_task(task_id):
-                    success_count += 1
-        except Exception:
-            error_count += 1
+    try:
+        if action == 'complete':
+            success_count = tdb.complete_many(task_ids)
+        elif action == 'uncomplete':
+            success_count = tdb.uncomplete_many(task_ids)
+        elif action == 'delete':
+            success_count = tdb.delete_many(task_ids)
+        elif action and action.startswith('priority:'):
+            priority = action.split(':', 1)[1].upper() or None
+            if priority and not (len(priority) == 1 and priority.isalpha()):
+                return _form_error('Invalid priority!')
+            success_count = tdb.set_priority_many(task_ids, priority)
+        else:
+            return _form_error('Unknown action!')
+    except Exception:
+        return _form_error(f'Failed to process {len(task_ids)} tasks!', 500)
 
+    body = {'action': action, 'changed': success_count}
     if success_count > 0:
         _backup_and_notify(tdb)
-        flash(f'Successfully processed {success_count} tasks!', 'success')
-    if error_count > 0:
-        flash(f'Failed to process {error_count} tasks!', 'error')
-
-    return redirect(url_for('index'))
+        return _form_success(tdb, f'Successfully processed {success_count} tasks!', body)
+    return _form_success(tdb, 'No selected tasks needed changing.', body, category='info')
 
 @app.route('/journal')
 @login_required
@@ -476,7 +660,8 @@ def restore_journal(journal_id):
     if not tdb:
         flash('Error accessing your todo list.', 'error')
         return redirect(url_for('view_journal'))
-    if tdb.restore_from_journal(journal_id):
+    task_id = request.form.get('task_id', type=int)
+    if tdb.restore_from_journal(journal_id, task_id):
         _backup_and_notify(tdb)
         flash('Task restored successfully.', 'success')
     else:
@@ -494,12 +679,11 @@ def export_todo():
         return redirect(url_for('index'))
 
     try:
-        content = tdb.to_todo_txt()
-        return Response(
-            content,
+        return _conditional_response(tdb, lambda: Response(
+            tdb.to_todo_txt(),
             mimetype='text/plain',
             headers={'Content-Disposition': f'attachment; filename=todo_{current_user.username}.txt'}
-        )
+        ))
     except Exception as e:
         flash(f'Error exporting file: {str(e)}', 'error')
         return redirect(url_for('index'))
@@ -509,35 +693,34 @@ def export_todo():
 def import_todo():
     """Import a todo.txt file for the current user"""
     if 'file' not in request.files:
-        flash('No file selected!', 'error')
-        return redirect(url_for('index'))
+        return _form_error('No file selected!')
 
     file = request.files['file']
     if file.filename == '':
-        flash('No file selected!', 'error')
-        return redirect(url_for('index'))
+        return _form_error('No file selected!')
 
-    if file and file.filename.endswith('.txt'):
-        try:
-            content = file.read().decode('utf-8')
-            tdb = get_user_todo_db()
-            if not tdb:
-                flash('Error accessing your todo list.', 'error')
-                return redirect(url_for('index'))
-            tdb.replace_from_txt(content)
-            _backup_and_notify(tdb)
-            flash('File imported successfully!', 'success')
-        except Exception as e:
-            flash(f'Error importing file: {str(e)}', 'error')
-    else:
-        flash('Please upload a .txt file!', 'error')
+    if not file.filename.endswith('.txt'):
+        return _form_error('Please upload a .txt file!')
 
-    return redirect(url_for('index'))
+    tdb = get_user_todo_db()
+    if not tdb:
+        return _form_error('Error accessing your todo list.', 500)
+    try:
+        content = file.read().decode('utf-8')
+        tdb.replace_from_txt(content, progress=_log_import_progress)
+    except Exception as e:
+        return _form_error(f'Error importing file: {str(e)}', 500)
+
+    _backup_and_notify(tdb)
+    return _form_success(tdb, 'File imported successfully!', {'stats': tdb.get_stats()})
 
 @app.route('/profile')
 @login_required
 def profile():
     """User profile page"""
+    return _render_profile()
+
+def _render_profile(new_token=None):
     tdb = get_user_todo_db()
     user_stats = {
         'total_tasks': 0,
@@ -548,11 +731,11 @@ def profile():
     }
 
     if tdb:
-        all_tasks = tdb.tasks
+        stats = tdb.get_stats()
         user_stats = {
-            'total_tasks': len(all_tasks),
-            'completed_tasks': sum(1 for t in all_tasks if t.completed),
-            'incomplete_tasks': sum(1 for t in all_tasks if not t.completed),
+            'total_tasks': stats['total'],
+            'completed_tasks': stats['completed'],
+            'incomplete_tasks': stats['incomplete'],
             'total_projects': len(tdb.get_all_projects()),
             'total_contexts': len(tdb.get_all_contexts())
         }
@@ -566,7 +749,30 @@ def profile():
                          user_stats=user_stats,
                          heatmap=heatmap,
                          user_todo_display_path=user_todo_display_path,
-                         todo_directory=todo_directory)
+                         todo_directory=todo_directory,
+                         api_tokens=user_manager.list_tokens(current_user.username),
+                         new_token=new_token)
+
+@app.route('/profile/tokens', methods=['POST'])
+@login_required
+def create_token():
+    """Create an API token and show it once"""
+    token, info = user_manager.create_token(current_user.username, request.form.get('name'))
+    if token is None:
+        flash(info, 'error')
+        return redirect(url_for('profile'))
+    # Rendered rather than flashed so the token never lands in the session cookie
+    return _render_profile(new_token={'token': token, 'name': info['name']})
+
+@app.route('/profile/tokens/<token_id>/revoke', methods=['POST'])
+@login_required
+def revoke_token(token_id):
+    """Revoke an API token"""
+    if user_manager.revoke_token(current_user.username, token_id):
+        flash('API token revoked.', 'success')
+    else:
+        flash('API token not found.', 'error')
+    return redirect(url_for('profile'))
 
 # REST API Endpoints with Basic Authentication
 
@@ -578,15 +784,14 @@ def api_get_todo():
         tdb = get_api_user_todo_db()
         if not tdb:
             return jsonify({'error': 'Internal server error', 'message': 'Could not access todo data'}), 500
-        content = tdb.to_todo_txt()
-        return Response(
-            content,
+        return _conditional_response(tdb, lambda: Response(
+            tdb.to_todo_txt(),
             mimetype='text/plain',
             headers={
                 'Content-Type': 'text/plain; charset=utf-8',
                 'X-Username': request.authenticated_user.username
             }
-        )
+        ))
     except Exception as e:
         return jsonify({'error': 'Internal server error', 'message': str(e)}), 500
 
@@ -612,10 +817,8 @@ def api_post_todo():
         if not tdb:
             return jsonify({'error': 'Internal server error', 'message': 'Could not access todo data'}), 500
 
-        tdb.replace_from_txt(content)
-        all_tasks = tdb.tasks
-        task_count = len(all_tasks)
-        completed_count = sum(1 for t in all_tasks if t.completed)
+        tdb.replace_from_txt(content, progress=_log_import_progress)
+        stats = tdb.get_stats()
 
         _backup_and_notify(tdb)
         return jsonify({
@@ -623,9 +826,9 @@ def api_post_todo():
             'message': 'Todo data updated successfully',
             'username': request.authenticated_user.username,
             'statistics': {
-                'total_tasks': task_count,
-                'completed_tasks': completed_count,
-                'incomplete_tasks': task_count - completed_count
+                'total_tasks': stats['total'],
+                'completed_tasks': stats['completed'],
+                'incomplete_tasks': stats['incomplete']
             }
         }), 200
 
@@ -641,38 +844,282 @@ def api_get_todo_info():
         if not tdb:
             return jsonify({'error': 'Internal server error', 'message': 'Could not access todo data'}), 500
 
-        all_tasks = tdb.tasks
-        total_tasks = len(all_tasks)
-        completed_tasks = sum(1 for t in all_tasks if t.completed)
-        incomplete_tasks = total_tasks - completed_tasks
+        return _conditional_response(tdb, lambda: _todo_info(tdb))
 
-        priority_counts = {'A': 0, 'B': 0, 'C': 0, 'None': 0}
-        for task in all_tasks:
-            if not task.completed:
-                if task.priority:
-                    priority_counts[task.priority] = priority_counts.get(task.priority, 0) + 1
-                else:
-                    priority_counts['None'] += 1
+    except Exception as e:
+        return jsonify({'error': 'Internal server error', 'message': str(e)}), 500
 
-        all_projects = tdb.get_all_projects()
-        all_contexts = tdb.get_all_contexts()
 
+def _todo_info(tdb: todo_db.TodoDb):
+    """Statistics payload for /api/v1/todo/info."""
+    stats = tdb.get_stats()
+    all_projects = tdb.get_all_projects()
+    all_contexts = tdb.get_all_contexts()
+
+    return jsonify({
+        'username': request.authenticated_user.username,
+        'statistics': {
+            'total_tasks': stats['total'],
+            'completed_tasks': stats['completed'],
+            'incomplete_tasks': stats['incomplete'],
+            'priority_distribution': stats['priorities'],
+            'total_projects': len(all_projects),
+            'total_contexts': len(all_contexts)
+        },
+        'projects': sorted(all_projects),
+        'contexts': sorted(all_contexts)
+    }), 200
+
+def _task_payload(tdb: todo_db.TodoDb, task_id: int, task):
+    """Body for a single-task response: the task and the revision after the change."""
+    return {'task': live.task_json(task_id, task), 'revision': tdb.revision}
+
+
+def _parse_task_fields(data, partial: bool):
+    """Validate a JSON task body; return (fields, error message).
+
+    ``description`` is required unless ``partial`` (PATCH).  ``priority`` is
+    a letter A-Z, or null/"" for none; ``projects`` and ``contexts`` are
+    lists of names; ``completed`` is a boolean.
+    """
+    if not isinstance(data, dict):
+        return None, 'Request body must be a JSON object'
+    fields = {}
+    if 'description' in data or not partial:
+        description = data.get('description')
+        if not isinstance(description, str) or not description.strip():
+            return None, 'description must be a non-empty string'
+        fields['description'] = description.strip()
+    if 'priority' in data:
+        priority = data['priority'] or None
+        if priority is not None and not (isinstance(priority, str) and len(priority) == 1
+                                         and 'A' <= priority <= 'Z'):
+            return None, 'priority must be a letter A-Z or null'
+        fields['priority'] = priority
+    for key in ('projects', 'contexts'):
+        if key in data:
+            names = data[key] or []
+            if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+                return None, f'{key} must be a list of strings'
+            fields[key] = [n.strip().lstrip('+@') for n in names if n.strip()]
+    if 'completed' in data:
+        if not isinstance(data['completed'], bool):
+            return None, 'completed must be true or false'
+        fields['completed'] = data['completed']
+    return fields, None
+
+
+@app.route('/api/v2/tasks', methods=['GET'])
+@api_auth_required
+def api_list_tasks():
+    """REST API: filtered task list; same parameters and body as /api/search."""
+    tdb = get_api_user_todo_db()
+    if not tdb:
+        return jsonify({'error': 'Could not access todo data'}), 500
+    return _conditional_response(tdb, lambda: _task_list_json(tdb))
+
+@app.route('/api/v2/tasks/<int:task_id>', methods=['GET'])
+@api_auth_required
+def api_get_task(task_id):
+    """REST API: one task."""
+    tdb = get_api_user_todo_db()
+    if not tdb:
+        return jsonify({'error': 'Could not access todo data'}), 500
+
+    def build():
+        task = tdb.get_task(task_id)
+        if not task:
+            return jsonify({'error': 'Task not found'}), 404
+        return jsonify(_task_payload(tdb, task_id, task))
+
+    return _conditional_response(tdb, build)
+
+@app.route('/api/v2/tasks', methods=['POST'])
+@api_auth_required
+def api_create_task():
+    """REST API: add a task; returns it with 201 and a Location header."""
+    fields, error = _parse_task_fields(request.get_json(silent=True), partial=False)
+    if error:
+        return jsonify({'error': error}), 400
+    tdb = get_api_user_todo_db()
+    if not tdb:
+        return jsonify({'error': 'Could not access todo data'}), 500
+
+    task = tdb.add_task(
+        description=fields['description'],
+        priority=fields.get('priority'),
+        projects=fields.get('projects'),
+        contexts=fields.get('contexts'),
+    )
+    task_id = task.line_number
+    if fields.get('completed'):
+        tdb.complete_task(task_id)
+        task = tdb.get_task(task_id)
+    _backup_and_notify(tdb)
+    response = jsonify(_task_payload(tdb, task_id, task))
+    response.status_code = 201
+    response.headers['Location'] = url_for('api_get_task', task_id=task_id)
+    return response
+
+@app.route('/api/v2/tasks/<int:task_id>', methods=['PATCH'])
+@api_auth_required
+def api_update_task(task_id):
+    """REST API: change some fields of a task; omitted fields keep their value."""
+    fields, error = _parse_task_fields(request.get_json(silent=True), partial=True)
+    if error:
+        return jsonify({'error': error}), 400
+    tdb = get_api_user_todo_db()
+    if not tdb:
+        return jsonify({'error': 'Could not access todo data'}), 500
+    if not tdb.get_task(task_id):
+        return jsonify({'error': 'Task not found'}), 404
+
+    if tdb.update_fields(task_id, fields):
+        _backup_and_notify(tdb)
+    return jsonify(_task_payload(tdb, task_id, tdb.get_task(task_id))), 200
+
+@app.route('/api/v2/tasks/<int:task_id>', methods=['DELETE'])
+@api_auth_required
+def api_delete_task(task_id):
+    """REST API: delete a task; returns it as it was before deletion."""
+    tdb = get_api_user_todo_db()
+    if not tdb:
+        return jsonify({'error': 'Could not access todo data'}), 500
+    task = tdb.get_task(task_id)
+    if not task or not tdb.delete_task(task_id):
+        return jsonify({'error': 'Task not found'}), 404
+    _backup_and_notify(tdb)
+    return jsonify(_task_payload(tdb, task_id, task)), 200
+
+# Most operations accepted in one /api/v2/batch request
+_BATCH_LIMIT = 500
+_BATCH_OPS = ('add', 'update', 'complete', 'uncomplete', 'delete', 'priority')
+
+
+def _parse_batch_op(data):
+    """Validate one /api/v2/batch operation; return (op dict for apply_batch, error)."""
+    if not isinstance(data, dict) or data.get('op') not in _BATCH_OPS:
+        return None, f"op must be one of: {', '.join(_BATCH_OPS)}"
+    kind = data['op']
+    op = {'op': kind}
+    if kind != 'add':
+        if not isinstance(data.get('id'), int) or isinstance(data['id'], bool):
+            return None, 'id must be an integer'
+        op['id'] = data['id']
+    if kind in ('add', 'update'):
+        fields, error = _parse_task_fields(
+            {k: v for k, v in data.items() if k not in ('op', 'id')}, partial=kind == 'update')
+        if error:
+            return None, error
+        op.update(fields)
+    elif kind == 'priority':
+        fields, error = _parse_task_fields({'priority': data.get('priority')}, partial=True)
+        if error:
+            return None, error
+        op.update(fields)
+    return op, None
+
+
+@app.route('/api/v2/batch', methods=['POST'])
+@api_auth_required
+def api_batch():
+    """REST API: apply an ordered list of task operations in one transaction.
+
+    Body: {"ops": [{"op": "add", "description": ...}, {"op": "complete", "id": 4}, ...],
+    "atomic": true}.  Atomic batches (the default) apply all or nothing;
+    with "atomic": false each op stands alone.  One live update and one
+    backup cover the whole batch.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('ops'), list):
+        return jsonify({'error': 'Request body must be {"ops": [...]}'}), 400
+    if len(data['ops']) > _BATCH_LIMIT:
+        return jsonify({'error': f'At most {_BATCH_LIMIT} ops per batch'}), 400
+    atomic = data.get('atomic', True)
+    if not isinstance(atomic, bool):
+        return jsonify({'error': 'atomic must be true or false'}), 400
+    ops = []
+    for index, raw_op in enumerate(data['ops']):
+        op, error = _parse_batch_op(raw_op)
+        if error:
+            return jsonify({'error': error, 'index': index}), 400
+        ops.append(op)
+    tdb = get_api_user_todo_db()
+    if not tdb:
+        return jsonify({'error': 'Could not access todo data'}), 500
+
+    results, committed = tdb.apply_batch(ops, atomic=atomic)
+    if committed and any(r['changed'] for r in results):
+        _backup_and_notify(tdb)
+    for result in results:
+        task = result.pop('task', None)
+        if task is not None:
+            result['task'] = live.task_json(result['id'], task)
+    return jsonify({
+        'committed': committed,
+        'revision': tdb.revision,
+        'results': results,
+    }), 200 if committed else 409
+
+@app.route('/api/v2/changes', methods=['GET'])
+@api_auth_required
+def api_get_changes():
+    """REST API: tasks upserted and deleted since a revision, from the journal."""
+    since = request.args.get('since', type=int)
+    if since is None or since < 0:
+        return jsonify({'error': 'since must be a non-negative integer'}), 400
+    tdb = get_api_user_todo_db()
+    if not tdb:
+        return jsonify({'error': 'Internal server error', 'message': 'Could not access todo data'}), 500
+
+    def build():
+        changes = tdb.get_changes(since)
         return jsonify({
-            'username': request.authenticated_user.username,
-            'statistics': {
-                'total_tasks': total_tasks,
-                'completed_tasks': completed_tasks,
-                'incomplete_tasks': incomplete_tasks,
-                'priority_distribution': priority_counts,
-                'total_projects': len(all_projects),
-                'total_contexts': len(all_contexts)
-            },
-            'projects': sorted(all_projects),
-            'contexts': sorted(all_contexts)
-        }), 200
+            'since': since,
+            'revision': changes['revision'],
+            'resync': changes['resync'],
+            'upserted': [live.task_json(t.line_number, t) for t in changes['upserted']],
+            'deleted': changes['deleted'],
+            'stats': tdb.get_stats(),
+        })
 
-    except Exception as e:
-        return jsonify({'error': 'Internal server error', 'message': str(e)}), 500
+    return _conditional_response(tdb, build)
+
+@app.route('/api/v2/events/stats', methods=['GET'])
+@api_auth_required
+def api_event_stats():
+    """REST API: bytes and events sent to the caller's open live update streams."""
+    streams = _sse_channels.stream_stats(_request_username())
+    return jsonify({
+        'streams': streams,
+        'events': sum(s['events'] for s in streams),
+        'bytes': sum(s['bytes'] for s in streams),
+    }), 200
+
+@app.route('/api/v2/tokens', methods=['GET'])
+@api_auth_required
+def api_list_tokens():
+    """REST API: the caller's API tokens (never the token values)."""
+    return jsonify({'tokens': user_manager.list_tokens(_request_username())}), 200
+
+@app.route('/api/v2/tokens', methods=['POST'])
+@api_auth_required
+def api_create_token():
+    """REST API: create an API token; its value is only returned here."""
+    data = request.get_json(silent=True) or {}
+    token, info = user_manager.create_token(_request_username(), data.get('name'))
+    if token is None:
+        return jsonify({'error': info}), 400
+    info = {k: v for k, v in info.items() if k != 'token_hash'}
+    return jsonify({'token': token, **info}), 201
+
+@app.route('/api/v2/tokens/<token_id>', methods=['DELETE'])
+@api_auth_required
+def api_revoke_token(token_id):
+    """REST API: revoke one of the caller's API tokens."""
+    if not user_manager.revoke_token(_request_username(), token_id):
+        return jsonify({'error': 'Token not found'}), 404
+    return '', 204
 
 import re as _re
 _DOWNLOAD_RE = _re.compile(r'^(todo|todotui-[a-z]+-[a-z0-9_]+)(\.sha256)?$')
@@ -771,27 +1218,37 @@ def nvim_file(filename):
 @login_required
 def events():
     """SSE endpoint — browser connects here to receive real-time task change notifications."""
+    username = current_user.username
+    tdb = get_user_todo_db()
+    revision = tdb.revision
+    q = _sse_channels.subscribe(username, revision,
+                                padding=live.padding_size(request.headers))
+    stats = q.stats
+
+    # A reconnecting EventSource sends the id of the last event it saw;
+    # the first connection passes the page's revision as ?since=.
+    replay = live.resume_event(
+        tdb, revision, request.headers.get('Last-Event-ID') or request.args.get('since')
+    )
+    # The stream can stay open for hours; don't pin a pooled reader to it.
+    todo_db.end_request()
+
     def stream():
-        q = queue.Queue(maxsize=10)
-        with _sse_lock:
-            _sse_clients.append(q)
         try:
-            # Padding flushes Cloudflare's ~4KB response buffer so events
-            # arrive in the browser immediately rather than being held.
-            yield ": " + " " * 4096 + "\n\n"
-            yield "data: connected\n\n"
+            # Behind a buffering proxy, padding flushes its buffer so
+            # events arrive in the browser immediately rather than held.
+            yield stats.comment(live.padding(stats.padding)
+                                + live.format_event('{}', event='connected'))
+            if replay:
+                yield stats.event(live.event_frame(replay))
             while True:
                 try:
-                    event = q.get(timeout=25)
-                    # Pad to flush Cloudflare's per-chunk buffer
-                    yield f"data: {event}\n\n: {' ' * 4096}\n\n"
+                    yield stats.event(q.get(timeout=live.HEARTBEAT))
                 except queue.Empty:
                     # Heartbeat keeps connection alive through proxies
-                    yield ": heartbeat\n\n"
+                    yield stats.comment(live.HEARTBEAT_FRAME)
         finally:
-            with _sse_lock:
-                if q in _sse_clients:
-                    _sse_clients.remove(q)
+            _sse_channels.unsubscribe(username, q)
 
     return Response(
         stream_with_context(stream()),
@@ -803,5 +1260,28 @@ def events():
     )
 
 
+def shutdown() -> None:
+    """Write what is still buffered in memory: last_login updates and
+    debounced todo.txt backups.
+
+    Registered with atexit.  Under gunicorn a worker that exits gracefully
+    runs it too; call it from a ``worker_exit`` hook to be explicit.
+    """
+    user_manager.stop()
+    _backup_worker.stop()
+
+
+atexit.register(shutdown)
+
+
+def _exit_on_signal(signum, frame):
+    # A plain exit instead of dying on the signal, so atexit hooks run
+    sys.exit(0)
+
+
 if __name__ == '__main__':
+    # `python app.py` is PID 1 in the Docker image: without this, docker
+    # stop's SIGTERM would end it without running shutdown()
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    signal.signal(signal.SIGINT, _exit_on_signal)
     app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,309 @@
+import argparse
+import gzip
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import todo_db
+
+
+class BackupWorker:
+    """Background writer for the dated todo.txt backups.
+
+    Mutations call schedule() instead of writing the backup inline.  A
+    single daemon thread writes each database's backup once it has been
+    quiet for ``debounce`` seconds, so a burst of writes produces one
+    export.  A database that keeps changing is still backed up at least
+    every ``max_delay`` seconds.
+    """
+
+    def __init__(self, backup_dir: str, debounce: float = 2.0, max_delay: Optional[float] = None):
+        self.backup_dir = backup_dir
+        self.debounce = debounce
+        self.max_delay = max_delay if max_delay is not None else debounce * 5
+        # db_path -> (first request time, last request time) of the pending backup
+        self._pending: Dict[str, tuple] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.written = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def schedule(self, db_path: str) -> None:
+        """Request a backup of db_path; coalesced with any pending request."""
+        now = time.monotonic()
+        with self._cond:
+            if db_path in self._pending:
+                first, _ = self._pending[db_path]
+                self._pending[db_path] = (first, now)
+                self.coalesced += 1
+            else:
+                self._pending[db_path] = (now, now)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='backup-worker', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _due_at(self, first: float, last: float) -> float:
+        return min(last + self.debounce, first + self.max_delay)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping and not self._pending:
+                        return
+                    now = time.monotonic()
+                    due = [
+                        path for path, (first, last) in self._pending.items()
+                        if self._stopping or self._due_at(first, last) <= now
+                    ]
+                    if due:
+                        break
+                    next_due = min(self._due_at(f, l) for f, l in self._pending.values()) \
+                        if self._pending else None
+                    self._cond.wait(None if next_due is None else next_due - now)
+                for path in due:
+                    del self._pending[path]
+            for path in due:
+                self._write(path)
+
+    def _write(self, db_path: str) -> None:
+        try:
+            todo_db.write_backup(db_path, self.backup_dir)
+            self.written += 1
+        except Exception:
+            self.errors += 1  # backup failure must never break the worker
+
+    def queue_depth(self) -> int:
+        """Number of databases with a backup pending."""
+        with self._cond:
+            return len(self._pending)
+
+    def lag(self) -> float:
+        """Seconds the oldest pending backup request has been waiting (0 if none)."""
+        with self._cond:
+            if not self._pending:
+                return 0.0
+            return time.monotonic() - min(first for first, _ in self._pending.values())
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self.queue_depth(),
+            'lag_seconds': round(self.lag(), 3),
+            'written': self.written,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+        }
+
+    def stop(self, timeout: Optional[float] = 30.0) -> None:
+        """Write every pending backup now and stop the worker thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+# Snapshots: full copies of a user's SQLite database (tasks, tags, journal
+# and ids), named <stem>_<YYYYmmddTHHMMSSffffff>.db or .db.gz.
+_SNAPSHOT_RE = re.compile(r'^(?P<stem>.+)_(?P<ts>\d{8}T\d{12})\.db(?P<gz>\.gz)?$')
+
+
+def create_snapshot(db_path: str, snapshot_dir: str, compress: bool = False) -> str:
+    """Write a consistent snapshot of db_path into snapshot_dir. Returns its path."""
+    os.makedirs(snapshot_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    ts = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    final_path = os.path.join(snapshot_dir, f"{stem}_{ts}.db" + (".gz" if compress else ""))
+    fd, tmp_db = tempfile.mkstemp(dir=snapshot_dir, prefix=f".{stem}_", suffix=".db.tmp")
+    os.close(fd)
+    try:
+        todo_db.backup_database(db_path, tmp_db)
+        if compress:
+            tmp_gz = tmp_db + ".gz"
+            with open(tmp_db, 'rb') as src, gzip.open(tmp_gz, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(tmp_db)
+            tmp_db = tmp_gz
+        os.replace(tmp_db, final_path)
+    except BaseException:
+        for path in (tmp_db, tmp_db + ".gz"):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    return final_path
+
+
+def list_snapshots(snapshot_dir: str, stem: Optional[str] = None) -> List[Tuple[datetime, str]]:
+    """Return (timestamp, path) for snapshots in snapshot_dir, newest first."""
+    if not os.path.isdir(snapshot_dir):
+        return []
+    found = []
+    for name in os.listdir(snapshot_dir):
+        m = _SNAPSHOT_RE.match(name)
+        if m and (stem is None or m.group('stem') == stem):
+            ts = datetime.strptime(m.group('ts'), '%Y%m%dT%H%M%S%f')
+            found.append((ts, os.path.join(snapshot_dir, name)))
+    found.sort(reverse=True)
+    return found
+
+
+def prune_snapshots(snapshot_dir: str, stem: str, hourly: int = 24, daily: int = 7,
+                    weekly: int = 4) -> List[str]:
+    """Apply hourly/daily/weekly retention to one database's snapshots.
+
+    The newest snapshot in each of the last ``hourly`` hours, ``daily`` days
+    and ``weekly`` ISO weeks that have snapshots is kept; the rest are
+    deleted.  Returns the deleted paths.
+    """
+    keep = set()
+    buckets = (
+        (hourly, lambda ts: ts.strftime('%Y%m%d%H')),
+        (daily, lambda ts: ts.strftime('%Y%m%d')),
+        (weekly, lambda ts: ts.isocalendar()[:2]),
+    )
+    snapshots = list_snapshots(snapshot_dir, stem)
+    for limit, bucket_of in buckets:
+        seen = set()
+        for ts, path in snapshots:
+            bucket = bucket_of(ts)
+            if bucket in seen:
+                continue
+            if len(seen) >= limit:
+                break
+            seen.add(bucket)
+            keep.add(path)
+    removed = []
+    for _, path in snapshots:
+        if path not in keep:
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+
+def restore_snapshot(snapshot_path: str, db_path: str) -> None:
+    """Replace db_path's contents with a snapshot (plain or .gz)."""
+    if not snapshot_path.endswith('.gz'):
+        todo_db.restore_database(db_path, snapshot_path)
+        return
+    fd, tmp_db = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        with gzip.open(snapshot_path, 'rb') as src, open(tmp_db, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        todo_db.restore_database(db_path, tmp_db)
+    finally:
+        os.remove(tmp_db)
+
+
+def _last_modified(db_path: str) -> float:
+    mtimes = [os.path.getmtime(p) for p in (db_path, db_path + '-wal') if os.path.exists(p)]
+    return max(mtimes) if mtimes else 0.0
+
+
+class SnapshotScheduler:
+    """Daemon thread that snapshots changed databases every ``interval`` seconds.
+
+    ``db_paths`` is called on each pass to list the databases to consider;
+    a database is only snapshotted if its files changed since its newest
+    snapshot.  Retention is applied after each snapshot.
+    """
+
+    def __init__(self, db_paths: Callable[[], Iterable[str]], snapshot_dir: str,
+                 interval: float = 3600, compress: bool = False,
+                 retention: Tuple[int, int, int] = (24, 7, 4)):
+        self.db_paths = db_paths
+        self.snapshot_dir = snapshot_dir
+        self.interval = interval
+        self.compress = compress
+        self.retention = retention
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.taken = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='snapshot-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self) -> None:
+        for db_path in list(self.db_paths()):
+            if self._stop.is_set():
+                return
+            if not os.path.exists(db_path):
+                continue
+            stem = os.path.splitext(os.path.basename(db_path))[0]
+            existing = list_snapshots(self.snapshot_dir, stem)
+            if existing and existing[0][0].timestamp() >= _last_modified(db_path):
+                continue
+            try:
+                create_snapshot(db_path, self.snapshot_dir, compress=self.compress)
+                prune_snapshots(self.snapshot_dir, stem, *self.retention)
+                self.taken += 1
+            except Exception:
+                self.errors += 1  # one bad database must not stop the others
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Snapshot and restore per-user todo databases.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('snapshot', help='Take a snapshot of a database')
+    p.add_argument('db_path')
+    p.add_argument('--dir', required=True, help='Snapshot directory')
+    p.add_argument('--compress', action='store_true', help='Write a gzip-compressed snapshot')
+
+    p = sub.add_parser('list', help='List snapshots, newest first')
+    p.add_argument('--dir', required=True, help='Snapshot directory')
+    p.add_argument('--stem', help='Only snapshots of this database (e.g. todo_alice)')
+
+    p = sub.add_parser('prune', help='Apply hourly/daily/weekly retention')
+    p.add_argument('stem', help='Database stem, e.g. todo_alice')
+    p.add_argument('--dir', required=True, help='Snapshot directory')
+    p.add_argument('--hourly', type=int, default=24)
+    p.add_argument('--daily', type=int, default=7)
+    p.add_argument('--weekly', type=int, default=4)
+
+    p = sub.add_parser('restore', help='Restore a database from a snapshot')
+    p.add_argument('snapshot')
+    p.add_argument('db_path')
+
+    args = parser.parse_args(argv)
+    if args.command == 'snapshot':
+        print(create_snapshot(args.db_path, args.dir, compress=args.compress))
+    elif args.command == 'list':
+        for ts, path in list_snapshots(args.dir, args.stem):
+            print(f"{ts.isoformat()}  {path}")
+    elif args.command == 'prune':
+        for path in prune_snapshots(args.dir, args.stem, args.hourly, args.daily, args.weekly):
+            print(f"removed {path}")
+    elif args.command == 'restore':
+        if not os.path.exists(args.snapshot):
+            print(f"Snapshot not found: {args.snapshot}", file=sys.stderr)
+            return 1
+        restore_snapshot(args.snapshot, args.db_path)
+        print(f"Restored {args.db_path} from {args.snapshot}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,6 +14,9 @@ USERNAME  = os.environ.get("TODO_USER", "")
 PASSWORD  = os.environ.get("TODO_PASS", "")
 VERSION   = "1.0.0 (web-api)"
 
+# Most ops the server accepts per /api/v2/batch request (app._BATCH_LIMIT)
+BATCH_LIMIT = 500
+
 # ── ANSI colors (matching todo.sh defaults) ───────────────────────────────────
 
 RESET   = "\033[0m"
@@ -40,51 +43,36 @@ g_hide_pri   = False                     # -P
 
 # ── HTTP session ─────────────────────────────────────────────────────────────
 
-_session       = requests.Session()
-_authenticated = False
+_session = requests.Session()
 
 
-def _login():
-    global _authenticated
+def _api(method, path, **kwargs):
+    """Call /api/v2 with basic auth: one small JSON request per change."""
     if not USERNAME or not PASSWORD:
         _die("Set TODO_USER and TODO_PASS environment variables.")
-    r = _session.post(
-        f"{BASE_URL}/login",
-        data={"username": USERNAME, "password": PASSWORD, "remember": "on"},
-        allow_redirects=True,
-    )
-    _authenticated = r.ok and "/login" not in r.url
-    if not _authenticated:
+    r = _session.request(method, f"{BASE_URL}/api/v2{path}",
+                         auth=(USERNAME, PASSWORD), **kwargs)
+    if r.status_code == 401:
         _die("Login failed — check TODO_USER and TODO_PASS.")
-
-
-def _get(path, **kwargs):
-    global _authenticated
-    if not _authenticated:
-        _login()
-    r = _session.get(f"{BASE_URL}{path}", allow_redirects=True, **kwargs)
-    if "/login" in r.url:
-        _login()
-        r = _session.get(f"{BASE_URL}{path}", allow_redirects=True, **kwargs)
     return r
 
 
-def _post(path, data):
-    global _authenticated
-    if not _authenticated:
-        _login()
-    r = _session.post(f"{BASE_URL}{path}", data=data, allow_redirects=True)
-    if "/login" in r.url:
-        _login()
-        r = _session.post(f"{BASE_URL}{path}", data=data, allow_redirects=True)
-    return r
+def _batch(ops):
+    """Apply ops via /api/v2/batch (best effort), BATCH_LIMIT per request; return per-op results."""
+    results = []
+    for start in range(0, len(ops), BATCH_LIMIT):
+        r = _api("POST", "/batch", json={"ops": ops[start:start + BATCH_LIMIT], "atomic": False})
+        if not r.ok:
+            _die(f"Batch request failed (HTTP {r.status_code})")
+        results.extend(r.json()["results"])
+    return results
 
 
 def _fetch(**params):
     defaults = {"q": "", "priority": "all", "project": "all",
                 "context": "all", "completed": "all"}
     defaults.update(params)
-    r = _get("/api/search", params=defaults)
+    r = _api("GET", "/tasks", params=defaults)
     r.raise_for_status()
     return r.json()["tasks"]
 
@@ -121,8 +109,14 @@ def _apply_visibility(raw):
 
 
 def _get_task(tid, completed="all"):
-    tasks = _fetch(completed=completed)
-    return next((t for t in tasks if t["id"] == tid), None)
+    r = _api("GET", f"/tasks/{tid}")
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    task = r.json()["task"]
+    if completed != "all" and task["completed"] != (completed == "completed"):
+        return None
+    return task
 
 
 def _clean_desc(description):
@@ -230,24 +224,19 @@ def cmd_addm(args):
 
 def _add_one(text):
     priority, desc, projects, contexts = _parse_raw(text)
-    r = _post("/add", {
+    r = _api("POST", "/tasks", json={
         "description": desc,
         "priority": priority,
-        "projects": ",".join(projects),
-        "contexts": ",".join(contexts),
+        "projects": projects,
+        "contexts": contexts,
     })
     if not r.ok:
         _die(f"Error adding task (HTTP {r.status_code})")
-    tasks = _fetch(completed="all")
-    candidates = [t for t in tasks if desc[:20] in t["description"]]
-    newest = max(candidates, key=lambda t: t["id"]) if candidates else None
-    if newest:
-        print(f"{newest['id']} {newest['raw_line']}")
-        if g_verbose:
-            total = len(_fetch(completed="incomplete"))
-            print(f"TODO: {newest['id']} added. ({total} tasks in todo list)")
-    else:
-        print("TODO: Task added.")
+    newest = r.json()["task"]
+    print(f"{newest['id']} {newest['raw_line']}")
+    if g_verbose:
+        total = len(_fetch(completed="incomplete"))
+        print(f"TODO: {newest['id']} added. ({total} tasks in todo list)")
 
 
 def cmd_append(args):
@@ -263,16 +252,15 @@ def cmd_append(args):
     contexts = list(set((task.get("contexts") or []) + new_ctx))
     sep = "" if text and text[0] in ",.;:" else " "
     new_desc = _clean_desc(task["description"]) + sep + appended_clean
-    r = _post(f"/edit/{tid}", {
+    r = _api("PATCH", f"/tasks/{tid}", json={
         "description": new_desc,
         "priority": task.get("priority") or "",
-        "projects": ",".join(projects),
-        "contexts": ",".join(contexts),
+        "projects": projects,
+        "contexts": contexts,
     })
     if r.ok:
-        updated = _get_task(tid)
-        if updated:
-            print(f"{tid} {updated['raw_line']}")
+        updated = r.json()["task"]
+        print(f"{tid} {updated['raw_line']}")
         if g_verbose:
             print(f"TODO: {tid} appended.")
     else:
@@ -293,17 +281,20 @@ def cmd_archive(args):
 def cmd_deduplicate(args):
     tasks = _fetch(completed="all")
     seen = {}
-    deleted = 0
+    dups = []
     for t in tasks:
         key = t["raw_line"].strip()
         if key in seen:
-            r = _get(f"/delete/{t['id']}")
-            if r.ok:
-                deleted += 1
-                if g_verbose:
-                    print(f"TODO: Deleted duplicate: {t['id']} {t['raw_line']}")
+            dups.append(t)
         else:
             seen[key] = t["id"]
+    results = _batch([{"op": "delete", "id": t["id"]} for t in dups]) if dups else []
+    deleted = 0
+    for t, res in zip(dups, results):
+        if res["changed"]:
+            deleted += 1
+            if g_verbose:
+                print(f"TODO: Deleted duplicate: {t['id']} {t['raw_line']}")
     print(f"TODO: {deleted} duplicate(s) removed.")
 
 
@@ -323,16 +314,15 @@ def cmd_del(args):
         raw_minus_term = re.sub(r'\s+', ' ', raw_minus_term)
         _, _, projects, contexts = _parse_raw(raw_minus_term)
         new_desc = _clean_desc(raw_minus_term)
-        r = _post(f"/edit/{tid}", {
+        r = _api("PATCH", f"/tasks/{tid}", json={
             "description": new_desc,
             "priority": task.get("priority") or "",
-            "projects": ",".join(projects),
-            "contexts": ",".join(contexts),
+            "projects": projects,
+            "contexts": contexts,
         })
         if r.ok:
-            updated = _get_task(tid)
-            if updated:
-                print(f"{tid} {updated['raw_line']}")
+            updated = r.json()["task"]
+            print(f"{tid} {updated['raw_line']}")
             if g_verbose:
                 print(f"TODO: {tid} updated.")
         else:
@@ -340,7 +330,7 @@ def cmd_del(args):
     else:
         if not _confirm(f"Delete '{task['raw_line']}'?"):
             print("TODO: No tasks were deleted."); return
-        r = _get(f"/delete/{tid}")
+        r = _api("DELETE", f"/tasks/{tid}")
         if r.ok:
             if g_verbose:
                 print(f"TODO: {tid} deleted.")
@@ -359,16 +349,10 @@ def cmd_depri(args):
             print(f"TODO: No task {num}.", file=sys.stderr); continue
         if not task.get("priority"):
             print(f"TODO: {num} is not prioritized."); continue
-        r = _post(f"/edit/{num}", {
-            "description": _clean_desc(task["description"]),
-            "priority": "",
-            "projects": ",".join(task.get("projects") or []),
-            "contexts": ",".join(task.get("contexts") or []),
-        })
+        r = _api("PATCH", f"/tasks/{num}", json={"priority": None})
         if r.ok:
-            updated = _get_task(num)
-            if updated:
-                print(f"{num} {updated['raw_line']}")
+            updated = r.json()["task"]
+            print(f"{num} {updated['raw_line']}")
             if g_verbose:
                 print(f"TODO: {num} deprioritized.")
         else:
@@ -378,20 +362,16 @@ def cmd_depri(args):
 def cmd_do(args):
     if not args:
         _die("Usage: todo do NUM [NUM ...]")
-    for num in _expand_nums(args):
-        task = _get_task(num, completed="incomplete")
-        if not task:
+    nums = _expand_nums(args)
+    results = _batch([{"op": "complete", "id": num} for num in nums])
+    for num, res in zip(nums, results):
+        if not res["changed"]:
             print(f"TODO: No incomplete task {num}.", file=sys.stderr); continue
-        r = _get(f"/complete/{num}")
-        if r.ok:
-            print(f"{num} {task['raw_line']}")
-            if g_verbose:
-                done = len(_fetch(completed="completed"))
-                print(f"TODO: {num} marked as done. ({done} done.)")
-            if g_auto_arch and g_verbose:
-                print("TODO: Archived.")
-        else:
-            print(f"TODO: Error completing {num} (HTTP {r.status_code})", file=sys.stderr)
+        print(f"{num} {res['task']['raw_line']}")
+        if g_verbose:
+            print(f"TODO: {num} marked as done.")
+        if g_auto_arch and g_verbose:
+            print("TODO: Archived.")
 
 
 def cmd_help(args):
@@ -485,16 +465,15 @@ def cmd_prepend(args):
     projects = list(set((task.get("projects") or []) + new_proj))
     contexts = list(set((task.get("contexts") or []) + new_ctx))
     new_desc = prepend_clean + " " + _clean_desc(task["description"])
-    r = _post(f"/edit/{tid}", {
+    r = _api("PATCH", f"/tasks/{tid}", json={
         "description": new_desc,
         "priority": task.get("priority") or "",
-        "projects": ",".join(projects),
-        "contexts": ",".join(contexts),
+        "projects": projects,
+        "contexts": contexts,
     })
     if r.ok:
-        updated = _get_task(tid)
-        if updated:
-            print(f"{tid} {updated['raw_line']}")
+        updated = r.json()["task"]
+        print(f"{tid} {updated['raw_line']}")
         if g_verbose:
             print(f"TODO: {tid} prepended.")
     else:
@@ -504,29 +483,19 @@ def cmd_prepend(args):
 def cmd_pri(args):
     if len(args) < 2:
         _die("Usage: todo pri NUM PRIORITY [NUM PRIORITY ...]")
-    pairs = list(zip(args[::2], args[1::2]))
-    for num_str, pri in pairs:
-        tid = int(num_str)
+    pairs = []
+    for num_str, pri in zip(args[::2], args[1::2]):
         pri = pri.upper()
         if not re.match(r'^[A-Z]$', pri):
             print(f"TODO: Priority must be A-Z.", file=sys.stderr); continue
-        task = _get_task(tid)
-        if not task:
+        pairs.append((int(num_str), pri))
+    results = _batch([{"op": "update", "id": tid, "priority": pri} for tid, pri in pairs])
+    for (tid, pri), res in zip(pairs, results):
+        if not res["ok"]:
             print(f"TODO: No task {tid}.", file=sys.stderr); continue
-        r = _post(f"/edit/{tid}", {
-            "description": _clean_desc(task["description"]),
-            "priority": pri,
-            "projects": ",".join(task.get("projects") or []),
-            "contexts": ",".join(task.get("contexts") or []),
-        })
-        if r.ok:
-            updated = _get_task(tid)
-            if updated:
-                print(f"{tid} {updated['raw_line']}")
-            if g_verbose:
-                print(f"TODO: {tid} prioritized ({pri}).")
-        else:
-            print(f"TODO: Error prioritizing {tid} (HTTP {r.status_code})", file=sys.stderr)
+        print(f"{tid} {res['task']['raw_line']}")
+        if g_verbose:
+            print(f"TODO: {tid} prioritized ({pri}).")
 
 
 def cmd_replace(args):
@@ -538,16 +507,15 @@ def cmd_replace(args):
     if not task:
         _die(f"No task {tid}.")
     priority, desc, projects, contexts = _parse_raw(text)
-    r = _post(f"/edit/{tid}", {
+    r = _api("PATCH", f"/tasks/{tid}", json={
         "description": desc,
         "priority": priority,
-        "projects": ",".join(projects),
-        "contexts": ",".join(contexts),
+        "projects": projects,
+        "contexts": contexts,
     })
     if r.ok:
-        updated = _get_task(tid)
-        if updated:
-            print(f"{tid} {updated['raw_line']}")
+        updated = r.json()["task"]
+        print(f"{tid} {updated['raw_line']}")
         if g_verbose:
             print(f"TODO: {tid} replaced.")
     else:
@@ -570,11 +538,10 @@ def cmd_undone(args):
         task = _get_task(num, completed="completed")
         if not task:
             print(f"TODO: No completed task {num}.", file=sys.stderr); continue
-        r = _get(f"/complete/{num}")
+        r = _api("PATCH", f"/tasks/{num}", json={"completed": False})
         if r.ok:
-            updated = _get_task(num)
-            if updated:
-                print(f"{num} {updated['raw_line']}")
+            updated = r.json()["task"]
+            print(f"{num} {updated['raw_line']}")
             if g_verbose:
                 print(f"TODO: {num} marked as incomplete.")
         else:
@@ -0,0 +1,271 @@
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# Seconds between heartbeat comments on an idle stream
+HEARTBEAT = float(os.environ.get('TODO_SSE_HEARTBEAT', '25'))
+# Seconds to gather a user's writes into one event before sending it;
+# 0 sends an event for every write
+COALESCE_WINDOW = float(os.environ.get('TODO_SSE_COALESCE', '0.1'))
+# Bytes of comment padding after each event.  Unset means pad only when a
+# proxy that buffers responses (Cloudflare holds ~4KB before flushing) is
+# detected from the request headers; a number forces that size, 0 disables
+PADDING = os.environ.get('TODO_SSE_PADDING', '').strip()
+PROXY_PADDING = 4096
+# Request headers added by proxies known to buffer event streams
+BUFFERING_PROXY_HEADERS = ('cf-ray',)
+# A reconnecting stream further behind than this many revisions is told
+# to resync (reload) instead of being sent a replay
+REPLAY_LIMIT = int(os.environ.get('TODO_SSE_REPLAY_LIMIT', '500'))
+
+
+def task_json(task_id: int, task) -> dict:
+    """JSON representation of a task shared by the JSON endpoints."""
+    return {
+        'id': task_id,
+        'description': task.get_clean_description(),
+        'completed': task.completed,
+        'priority': task.priority,
+        'list_priority': task.list_priority,
+        'projects': task.projects,
+        'contexts': task.contexts,
+        'creation_date': task.creation_date,
+        'completion_date': task.completion_date,
+        'raw_line': task.raw_line
+    }
+
+
+def change_event(tdb, since: int) -> dict:
+    """Live update event for everything in tdb after revision since."""
+    delta = tdb.get_changes(since)
+    event = {'id': delta['revision'], 'since': since}
+    if delta['resync']:
+        event['resync'] = True
+    else:
+        event['upserted'] = [task_json(t.line_number, t) for t in delta['upserted']]
+        event['deleted'] = delta['deleted']
+        event['stats'] = tdb.get_stats()
+    return event
+
+
+def resume_event(tdb, revision: int, resume: Optional[str]) -> Optional[dict]:
+    """Catch-up event for a stream opened with Last-Event-ID (or ?since=) ``resume``.
+
+    None when there is nothing to replay; a resync event when the client
+    is more than REPLAY_LIMIT revisions away.
+    """
+    if not resume or not resume.isdigit() or int(resume) == revision:
+        return None
+    since = int(resume)
+    if abs(revision - since) > REPLAY_LIMIT:
+        return {'id': revision, 'since': since, 'resync': True}
+    return change_event(tdb, since)
+
+
+def format_event(data: str, event_id: Optional[int] = None, event: Optional[str] = None) -> str:
+    """Frame one Server-Sent Event."""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+def event_frame(event: dict) -> str:
+    """Frame a change event: its 'id' becomes the SSE id (the journal id),
+    and resync events get their own event name."""
+    return format_event(json.dumps(event), event.get('id'),
+                        'resync' if event.get('resync') else None)
+
+
+def padding_size(headers) -> int:
+    """Padding for a stream opened with request ``headers`` (case-insensitive get)."""
+    if PADDING:
+        return int(PADDING)
+    if any(headers.get(name) for name in BUFFERING_PROXY_HEADERS):
+        return PROXY_PADDING
+    return 0
+
+
+def padding(size: int) -> str:
+    """Comment frame of ``size`` bytes, or '' for none."""
+    return f": {' ' * size}\n\n" if size > 0 else ""
+
+
+HEARTBEAT_FRAME = ": heartbeat\n\n"
+
+
+class StreamStats:
+    """What one stream has written, for watching live update bandwidth."""
+
+    def __init__(self, username: str, padding: int = 0):
+        self.username = username
+        self.padding = padding
+        self.opened = time.time()
+        self.events = 0
+        self.bytes = 0
+
+    def event(self, frame: str) -> str:
+        """Count an event frame about to be written; return it padded."""
+        self.events += 1
+        return self.comment(frame + padding(self.padding))
+
+    def comment(self, frame: str) -> str:
+        """Count a non-event frame (connected, heartbeat) about to be written."""
+        self.bytes += len(frame.encode())
+        return frame
+
+    def as_dict(self) -> dict:
+        return {'username': self.username, 'opened': self.opened, 'padding': self.padding,
+                'events': self.events, 'bytes': self.bytes}
+
+
+class ThreadStream(queue.Queue):
+    """Bounded frame queue read by a blocking (one thread per tab) stream."""
+
+    def __init__(self, maxsize: int = 0, stats: Optional[StreamStats] = None):
+        super().__init__(maxsize)
+        self.stats = stats
+
+    def offer(self, frame: str, event_id: int) -> None:
+        try:
+            self.put_nowait(frame)
+        except queue.Full:
+            # A stalled tab has missed events: replace its backlog with a
+            # single resync so it reloads instead of applying a partial set.
+            with self.mutex:
+                self.queue.clear()
+            self.put_nowait(event_frame({'id': event_id, 'resync': True}))
+
+
+class SseChannels:
+    """Per-user fan-out of task change events to Server-Sent Events streams.
+
+    Each browser tab subscribes a stream under its username; a stream is
+    anything with ``offer(frame, event_id)`` and a ``stats`` StreamStats
+    (ThreadStream by default).  publish() asks the caller for the changes
+    since the revision last sent to that user and offers one JSON event,
+    with the journal id as its SSE id, to that user's streams only.  Other
+    users' tabs never wake up, and publishing for a user with no open tabs
+    costs nothing.
+
+    Publishes for a user within ``window`` seconds of each other become a
+    single event, so a burst of writes reaches each tab once.
+    """
+
+    def __init__(self, maxsize: int = 10, window: float = COALESCE_WINDOW):
+        self.maxsize = maxsize
+        self.window = window
+        self._lock = threading.Lock()
+        self._clients: Dict[str, List] = {}
+        # Last revision delivered per user; the next event starts from it.
+        self._revisions: Dict[str, int] = {}
+        self._publish_locks: Dict[str, threading.Lock] = {}
+        # Latest changes callback per user waiting for its window to close
+        self._pending: Dict[str, Callable[[int], dict]] = {}
+        # Counters of streams that have closed
+        self.closed = {'streams': 0, 'events': 0, 'bytes': 0}
+        self.errors = 0
+
+    def subscribe(self, username: str, revision: int, stream=None, padding: int = 0):
+        """Register a stream for username, currently at ``revision``; return it."""
+        if stream is None:
+            stream = ThreadStream(maxsize=self.maxsize)
+        if stream.stats is None:
+            stream.stats = StreamStats(username, padding)
+        with self._lock:
+            self._clients.setdefault(username, []).append(stream)
+            self._revisions.setdefault(username, revision)
+            self._publish_locks.setdefault(username, threading.Lock())
+        return stream
+
+    def unsubscribe(self, username: str, stream) -> None:
+        with self._lock:
+            clients = self._clients.get(username, [])
+            if stream in clients:
+                clients.remove(stream)
+                self.closed['streams'] += 1
+                self.closed['events'] += stream.stats.events
+                self.closed['bytes'] += stream.stats.bytes
+            if not clients:
+                self._clients.pop(username, None)
+                self._revisions.pop(username, None)
+
+    def subscriber_count(self, username: Optional[str] = None) -> int:
+        with self._lock:
+            if username is not None:
+                return len(self._clients.get(username, ()))
+            return sum(len(c) for c in self._clients.values())
+
+    def stream_stats(self, username: Optional[str] = None) -> List[dict]:
+        """Counters of each open stream (for one user, or all of them)."""
+        with self._lock:
+            if username is not None:
+                streams = list(self._clients.get(username, ()))
+            else:
+                streams = [s for c in self._clients.values() for s in c]
+        return [s.stats.as_dict() for s in streams]
+
+    def publish(self, username: str, changes: Callable[[int], dict]) -> Optional[dict]:
+        """Send the changes since the user's last event to their streams.
+
+        ``changes(since)`` returns the event as a dict whose 'id' is the
+        revision it brings the user up to.  With a coalescing window the
+        event goes out from a timer when the window closes, built by the
+        last callback published in it, and this returns None; without one
+        it is sent now and returned (None if there was nothing to send).
+        """
+        if self.window <= 0:
+            return self._send(username, changes)
+        with self._lock:
+            if username not in self._clients:
+                return None
+            waiting = username in self._pending
+            self._pending[username] = changes
+        if not waiting:
+            timer = threading.Timer(self.window, self._flush, (username,))
+            timer.daemon = True
+            timer.start()
+        return None
+
+    def _flush(self, username: str) -> None:
+        with self._lock:
+            changes = self._pending.pop(username, None)
+        if changes is None:
+            return
+        try:
+            self._send(username, changes)
+        except Exception:
+            self.errors += 1  # the tabs catch up from the next event
+
+    def _send(self, username: str, changes: Callable[[int], dict]) -> Optional[dict]:
+        """Build the user's event now and offer it to their streams.
+
+        Calls for the same user are serialised so events reach each
+        stream in revision order.
+        """
+        with self._lock:
+            lock = self._publish_locks.get(username)
+        if lock is None:
+            return None
+        with lock:
+            with self._lock:
+                since = self._revisions.get(username)
+            if since is None:
+                return None
+            event = changes(since)
+            if event['id'] <= since:
+                return None
+            with self._lock:
+                if username in self._revisions:
+                    self._revisions[username] = event['id']
+                clients = list(self._clients.get(username, ()))
+            frame = event_frame(event)
+            for stream in clients:
+                stream.offer(frame, event['id'])
+        return event
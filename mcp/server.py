@@ -18,43 +18,19 @@ BASE_URL = os.environ.get("TODOTXT_WEB_URL", "http://localhost:5000").rstrip("/"
 
 mcp = FastMCP("todotxt")
 _session = requests.Session()
-_authenticated = False
 
 
-def _login():
-    global _authenticated
+def _api(method: str, path: str, **kwargs):
+    """Call /api/v2 with basic auth: one request per operation, no login round trip."""
     user = os.environ.get("TODOTXT_USER", "")
     passwd = os.environ.get("TODOTXT_PASS", "")
     if not user or not passwd:
         raise RuntimeError("Set TODOTXT_USER and TODOTXT_PASS environment variables.")
-    resp = _session.post(
-        f"{BASE_URL}/login",
-        data={"username": user, "password": passwd, "remember": "on"},
-        allow_redirects=True,
-    )
-    _authenticated = resp.ok and "/login" not in resp.url
-
-
-def _get(path: str, **kwargs):
-    global _authenticated
-    if not _authenticated:
-        _login()
-    resp = _session.get(f"{BASE_URL}{path}", allow_redirects=True, **kwargs)
-    if resp.url.endswith("/login"):
-        _login()
-        resp = _session.get(f"{BASE_URL}{path}", allow_redirects=True, **kwargs)
-    return resp
+    return _session.request(method, f"{BASE_URL}/api/v2{path}", auth=(user, passwd), **kwargs)
 
 
-def _post(path: str, data: dict):
-    global _authenticated
-    if not _authenticated:
-        _login()
-    resp = _session.post(f"{BASE_URL}{path}", data=data, allow_redirects=True)
-    if resp.url.endswith("/login"):
-        _login()
-        resp = _session.post(f"{BASE_URL}{path}", data=data, allow_redirects=True)
-    return resp
+def _split(names: str) -> list[str]:
+    return [n.strip() for n in names.split(",") if n.strip()]
 
 
 @mcp.tool()
@@ -73,8 +49,9 @@ def list_tasks(
     Returns a list of task dicts with: id, description, completed, priority,
     projects, contexts, creation_date, completion_date, raw_line.
     """
-    resp = _get(
-        "/api/search",
+    resp = _api(
+        "GET",
+        "/tasks",
         params={
             "q": search,
             "priority": priority,
@@ -100,24 +77,26 @@ def add_task(
     contexts: comma-separated, e.g. 'home,weekend'
     priority: single uppercase letter A-Z, or empty for none
     """
-    resp = _post(
-        "/add",
-        data={
+    resp = _api(
+        "POST",
+        "/tasks",
+        json={
             "description": description,
-            "priority": priority,
-            "projects": projects,
-            "contexts": contexts,
+            "priority": priority or None,
+            "projects": _split(projects),
+            "contexts": _split(contexts),
         },
     )
     if resp.ok:
-        return "Task added."
+        task = resp.json()["task"]
+        return f"Task {task['id']} added: {task['raw_line']}"
     return f"Failed (HTTP {resp.status_code})."
 
 
 @mcp.tool()
 def complete_task(task_id: int) -> str:
     """Mark a task as completed. Use list_tasks to find the task id."""
-    resp = _get(f"/complete/{task_id}")
+    resp = _api("PATCH", f"/tasks/{task_id}", json={"completed": True})
     if resp.ok:
         return f"Task {task_id} marked complete."
     return f"Failed (HTTP {resp.status_code})."
@@ -126,7 +105,7 @@ def complete_task(task_id: int) -> str:
 @mcp.tool()
 def uncomplete_task(task_id: int) -> str:
     """Mark a completed task as incomplete. Use list_tasks to find the task id."""
-    resp = _get(f"/complete/{task_id}")
+    resp = _api("PATCH", f"/tasks/{task_id}", json={"completed": False})
     if resp.ok:
         return f"Task {task_id} marked incomplete."
     return f"Failed (HTTP {resp.status_code})."
@@ -145,13 +124,14 @@ def edit_task(
     projects: comma-separated, e.g. 'homelab,work'
     contexts: comma-separated, e.g. 'home,weekend'
     """
-    resp = _post(
-        f"/edit/{task_id}",
-        data={
+    resp = _api(
+        "PATCH",
+        f"/tasks/{task_id}",
+        json={
             "description": description,
-            "priority": priority,
-            "projects": projects,
-            "contexts": contexts,
+            "priority": priority or None,
+            "projects": _split(projects),
+            "contexts": _split(contexts),
         },
     )
     if resp.ok:
@@ -162,7 +142,7 @@ def edit_task(
 @mcp.tool()
 def delete_task(task_id: int) -> str:
     """Permanently delete a task by id. Use list_tasks to find the task id."""
-    resp = _get(f"/delete/{task_id}")
+    resp = _api("DELETE", f"/tasks/{task_id}")
     if resp.ok:
         return f"Task {task_id} deleted."
     return f"Failed (HTTP {resp.status_code})."
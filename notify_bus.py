@@ -0,0 +1,287 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+from urllib.parse import unquote, urlsplit
+
+# handler(username, revision) is called once per change in every process.
+Handler = Callable[[str, int], None]
+
+
+class LocalBus:
+    """In-process bus: delivers straight to this process's handler.
+
+    Enough when the app runs as a single process; every other backend
+    also delivers local publishes this way, without a round trip.
+    """
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    def publish(self, username: str, revision: int) -> None:
+        if self._handler:
+            self._handler(username, revision)
+
+    def stop(self) -> None:
+        self._handler = None
+
+
+class _RemoteBus(LocalBus):
+    """Common parts of the cross-process backends.
+
+    Messages carry an origin id so a process skips its own publishes
+    (already delivered locally) when they come back from the transport.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.origin = uuid.uuid4().hex
+        self.received = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, handler: Handler) -> None:
+        super().start(handler)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name=type(self).__name__,
+                                        daemon=True)
+        self._thread.start()
+
+    def publish(self, username: str, revision: int) -> None:
+        super().publish(username, revision)
+        self._send(json.dumps({'u': username, 'r': revision, 'o': self.origin}))
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        super().stop()
+
+    def _deliver(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            if message['o'] == self.origin or not self._handler:
+                return
+            self.received += 1
+            self._handler(message['u'], int(message['r']))
+        except Exception:
+            self.errors += 1  # one bad message must not kill the listener
+
+    def _send(self, payload: str) -> None:
+        raise NotImplementedError
+
+    def _listen(self) -> None:
+        raise NotImplementedError
+
+
+class SqliteBus(_RemoteBus):
+    """Cross-process bus for several workers on one host, via a shared SQLite file.
+
+    Publishes append a row; each process polls for rows newer than the
+    last one it saw.  Rows older than ``retention`` seconds are pruned.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.25, retention: float = 60.0):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        # Publishes come from request threads; they share one connection
+        self._send_lock = threading.Lock()
+        self._send_conn = self._connect()
+        with self._send_conn as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS notifications (
+                       id       INTEGER PRIMARY KEY AUTOINCREMENT,
+                       payload  TEXT NOT NULL,
+                       ts       REAL NOT NULL
+                   )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _send(self, payload: str) -> None:
+        with self._send_lock, self._send_conn as conn:
+            conn.execute("INSERT INTO notifications (payload, ts) VALUES (?, ?)",
+                         (payload, time.time()))
+
+    def _listen(self) -> None:
+        conn = self._connect()
+        last = conn.execute("SELECT coalesce(max(id), 0) FROM notifications").fetchone()[0]
+        next_prune = 0.0
+        while not self._stop.wait(self.poll_interval):
+            try:
+                rows = conn.execute(
+                    "SELECT id, payload FROM notifications WHERE id > ? ORDER BY id", (last,)
+                ).fetchall()
+                for row_id, payload in rows:
+                    last = row_id
+                    self._deliver(payload)
+                now = time.time()
+                if now >= next_prune:
+                    with conn:
+                        conn.execute("DELETE FROM notifications WHERE ts < ?",
+                                     (now - self.retention,))
+                    next_prune = now + self.retention
+            except sqlite3.Error:
+                self.errors += 1
+
+
+def _resp_command(*args: str) -> bytes:
+    out = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg.encode()
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+def _resp_read(f):
+    """Read one RESP reply from a buffered socket file."""
+    line = f.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise ConnectionError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        size = int(rest)
+        if size < 0:
+            return None
+        data = f.read(size + 2)
+        return data[:-2].decode()
+    if kind == b"*":
+        size = int(rest)
+        return None if size < 0 else [_resp_read(f) for _ in range(size)]
+    raise ConnectionError(f"unexpected reply {line!r}")
+
+
+class RedisBus(_RemoteBus):
+    """Cross-node bus over Redis PUBLISH/SUBSCRIBE.
+
+    Speaks the Redis protocol directly, so no client library is needed and
+    any RESP-compatible server works.  The listener reconnects with
+    backoff; notices published while it is down are lost, which live
+    streams recover from through Last-Event-ID replay.
+    """
+
+    def __init__(self, url: str, channel: str = "todotxt:updates", timeout: float = 5.0):
+        super().__init__()
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.channel = channel
+        self.timeout = timeout
+        self._pub_lock = threading.Lock()
+        self._pub_sock: Optional[socket.socket] = None
+        self._pub_file = None
+        self._sub_sock: Optional[socket.socket] = None
+
+    def _connect(self, timeout: Optional[float]):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.settimeout(timeout)
+        f = sock.makefile("rb")
+        if self.password:
+            sock.sendall(_resp_command("AUTH", self.password))
+            _resp_read(f)
+        return sock, f
+
+    def _send(self, payload: str) -> None:
+        with self._pub_lock:
+            for attempt in (1, 2):
+                try:
+                    if self._pub_sock is None:
+                        self._pub_sock, self._pub_file = self._connect(self.timeout)
+                    self._pub_sock.sendall(_resp_command("PUBLISH", self.channel, payload))
+                    _resp_read(self._pub_file)
+                    return
+                except OSError:  # includes ConnectionError from _resp_read
+                    self._close_publisher()
+                    if attempt == 2:
+                        raise
+
+    def _close_publisher(self) -> None:
+        if self._pub_sock is not None:
+            try:
+                self._pub_sock.close()
+            except OSError:
+                pass
+        self._pub_sock = self._pub_file = None
+
+    def _listen(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                # Blocking reads; stop() shuts the socket down to wake us.
+                # Keepalive notices a peer that vanished without closing.
+                sock, f = self._connect(None)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                self._sub_sock = sock
+                sock.sendall(_resp_command("SUBSCRIBE", self.channel))
+                _resp_read(f)
+                backoff = 0.5
+                while not self._stop.is_set():
+                    reply = _resp_read(f)
+                    if isinstance(reply, list) and reply and reply[0] == "message":
+                        self._deliver(reply[2])
+            except OSError:
+                if self._stop.is_set():
+                    break
+                self.errors += 1
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if self._sub_sock is not None:
+                    self._sub_sock.close()
+                    self._sub_sock = None
+
+    def stop(self) -> None:
+        self._stop.set()
+        sock = self._sub_sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        super().stop()
+        with self._pub_lock:
+            self._close_publisher()
+
+
+def create_bus(spec: str, data_dir: str = ".") -> LocalBus:
+    """Build a bus from a TODO_NOTIFY_BUS value.
+
+    ``local`` (or empty) for a single process, ``sqlite`` or
+    ``sqlite:///path/to/notify.db`` for several workers on one host, and
+    ``redis://[:password@]host[:port]`` for several hosts.
+    """
+    spec = (spec or "local").strip()
+    if spec == "local":
+        return LocalBus()
+    if spec == "sqlite":
+        return SqliteBus(os.path.join(data_dir, "notify.db"))
+    if spec.startswith("sqlite:"):
+        path = spec[len("sqlite:"):]
+        if path.startswith("//"):
+            path = path[2:]
+        return SqliteBus(path)
+    if spec.startswith("redis://"):
+        return RedisBus(spec)
+    raise ValueError(f"Unknown TODO_NOTIFY_BUS: {spec!r}")
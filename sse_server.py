@@ -0,0 +1,247 @@
+"""Event-loop server for the /events live update stream.
+
+The Flask /events endpoint holds one worker thread per open browser tab.
+This server holds each tab as an asyncio task instead, so tens of
+thousands of idle streams cost a few kilobytes each.  Run it next to the
+web app and route /events to it from the reverse proxy, e.g. for nginx:
+
+    location /events {
+        proxy_pass http://127.0.0.1:5002;
+        proxy_buffering off;
+        proxy_read_timeout 1h;
+    }
+
+It authenticates with the app's session cookie (same SECRET_KEY), reads
+the same per-user databases, and learns about writes from the same
+notification bus, so TODO_NOTIFY_BUS must be ``sqlite`` or ``redis://``
+when the app runs in other processes.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from http.cookies import SimpleCookie
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from flask import Flask
+from flask_login.utils import decode_cookie
+
+import live
+import notify_bus
+import todo_db
+from user_manager import UserManager, create_user_manager
+
+# Must match app.py so session cookies verify
+_cookie_app = Flask(__name__)
+_cookie_app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-change-this-in-production')
+
+_MAX_HEADER_BYTES = 16384
+
+
+class AsyncStream:
+    """Frame queue for one stream, fed from any thread, read on the loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = 10):
+        self._loop = loop
+        self.stats = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, frame: str, event_id: int) -> None:
+        self._loop.call_soon_threadsafe(self._put, frame, event_id)
+
+    def _put(self, frame: str, event_id: int) -> None:
+        try:
+            self._queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Same policy as live.ThreadStream: drop the backlog, resync
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(live.event_frame({'id': event_id, 'resync': True}))
+
+    async def get(self) -> str:
+        return await self._queue.get()
+
+
+def session_username(cookie_header: str) -> Optional[str]:
+    """Username of the flask-login session (or remember cookie), if valid."""
+    cookies = SimpleCookie()
+    try:
+        cookies.load(cookie_header or '')
+    except Exception:
+        return None
+    config = _cookie_app.config
+    session_cookie = cookies.get(config['SESSION_COOKIE_NAME'])
+    if session_cookie:
+        serializer = _cookie_app.session_interface.get_signing_serializer(_cookie_app)
+        try:
+            data = serializer.loads(
+                session_cookie.value,
+                max_age=int(_cookie_app.permanent_session_lifetime.total_seconds()),
+            )
+            if data.get('_user_id'):
+                return data['_user_id']
+        except Exception:
+            pass
+    remember = cookies.get(config.get('REMEMBER_COOKIE_NAME', 'remember_token'))
+    if remember:
+        with _cookie_app.app_context():
+            return decode_cookie(remember.value)
+    return None
+
+
+class SseServer:
+    def __init__(self, channels: live.SseChannels, user_manager: UserManager):
+        self.channels = channels
+        self.user_manager = user_manager
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            await self._reply(writer, 400, "Bad Request")
+            return
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        if url.path == "/healthz":
+            await self._reply(writer, 200, "OK")
+            return
+        if url.path == "/stats":
+            username = session_username(headers.get("cookie", ""))
+            await self._reply(writer, 200, "OK", json.dumps(self.stats(username)),
+                              "application/json")
+            return
+        if url.path != "/events" or method != "GET":
+            await self._reply(writer, 404, "Not Found")
+            return
+        username = session_username(headers.get("cookie", ""))
+        db_path = username and self.user_manager.get_user_db_path(username)
+        if not db_path or not os.path.exists(db_path):
+            await self._reply(writer, 401, "Authentication required")
+            return
+        resume = headers.get("last-event-id") or parse_qs(url.query).get("since", [None])[0]
+        await self.stream(writer, username, db_path, resume, live.padding_size(headers))
+
+    def stats(self, username: Optional[str] = None) -> dict:
+        """Totals for watching bandwidth, plus the per-stream counters of
+        ``username``'s own streams when the caller is logged in.
+
+        Totals carry no usernames, so they are safe to serve unauthenticated.
+        """
+        streams = self.channels.stream_stats()
+        stats = {
+            'open_streams': len(streams),
+            'closed': dict(self.channels.closed),
+            'events': sum(s['events'] for s in streams) + self.channels.closed['events'],
+            'bytes': sum(s['bytes'] for s in streams) + self.channels.closed['bytes'],
+        }
+        if username:
+            stats['streams'] = [s for s in streams if s['username'] == username]
+        return stats
+
+    async def stream(self, writer, username: str, db_path: str, resume: Optional[str],
+                     padding: int) -> None:
+        loop = asyncio.get_running_loop()
+        stream = AsyncStream(loop, self.channels.maxsize)
+
+        def start():
+            # SQLite reads run off the loop
+            tdb = todo_db.TodoDb(db_path)
+            revision = tdb.revision
+            self.channels.subscribe(username, revision, stream, padding)
+            return live.resume_event(tdb, revision, resume)
+
+        replay = await loop.run_in_executor(None, start)
+        stats = stream.stats
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/event-stream; charset=utf-8\r\n"
+                b"Cache-Control: no-cache\r\n"
+                b"X-Accel-Buffering: no\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            writer.write(stats.comment(live.padding(stats.padding)
+                                       + live.format_event('{}', event='connected')).encode())
+            if replay:
+                writer.write(stats.event(live.event_frame(replay)).encode())
+            await writer.drain()
+            while True:
+                try:
+                    frame = await asyncio.wait_for(stream.get(), live.HEARTBEAT)
+                    writer.write(stats.event(frame).encode())
+                except asyncio.TimeoutError:
+                    writer.write(stats.comment(live.HEARTBEAT_FRAME).encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.channels.unsubscribe(username, stream)
+            writer.close()
+
+    @staticmethod
+    async def _reply(writer, status: int, reason: str, body: Optional[str] = None,
+                     content_type: str = "text/plain") -> None:
+        body = (reason if body is None else body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Serve /events from an asyncio event loop.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('TODO_SSE_PORT', '5002')))
+    args = parser.parse_args(argv)
+
+    user_manager = create_user_manager()
+    channels = live.SseChannels()
+    server = SseServer(channels, user_manager)
+
+    def deliver(username: str, revision: int) -> None:
+        if not channels.subscriber_count(username):
+            return
+        tdb = todo_db.TodoDb(user_manager.get_user_db_path(username))
+        channels.publish(username, lambda since: live.change_event(tdb, since))
+
+    bus = notify_bus.create_bus(os.environ.get('TODO_NOTIFY_BUS', ''), user_manager.todo_dir)
+    if type(bus) is notify_bus.LocalBus:
+        print('warning: TODO_NOTIFY_BUS is local; writes made by the web app '
+              'will not reach this server', file=sys.stderr)
+    bus.start(deliver)
+
+    async def serve():
+        srv = await asyncio.start_server(server.handle, args.host, args.port,
+                                         limit=_MAX_HEADER_BYTES)
+        async with srv:
+            await srv.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bus.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,746 @@
+// Todo.txt Web Manager JavaScript
+
+// Global variables
+let searchTimeout;
+
+// Initialize when DOM is loaded
+document.addEventListener('DOMContentLoaded', function() {
+    initializeApp();
+});
+
+function initializeApp() {
+    // Initialize search functionality
+    initializeSearch();
+    
+    // Initialize filter functionality
+    initializeFilters();
+    
+    // Initialize task selection
+    initializeTaskSelection();
+    
+    // Initialize keyboard shortcuts
+    initializeKeyboardShortcuts();
+    
+    // Load further pages of the task list on scroll
+    initializeInfiniteScroll();
+    
+    // Patch the task list from server-sent change events
+    initializeLiveUpdates();
+    
+    // Run row and bulk actions without reloading the page
+    initializeInlineActions();
+    
+    // Initialize tooltips if Bootstrap is available
+    if (typeof bootstrap !== 'undefined') {
+        var tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
+        var tooltipList = tooltipTriggerList.map(function (tooltipTriggerEl) {
+            return new bootstrap.Tooltip(tooltipTriggerEl);
+        });
+    }
+}
+
+// Search functionality
+function initializeSearch() {
+    const searchInput = document.getElementById('search');
+    if (searchInput) {
+        searchInput.addEventListener('input', function() {
+            clearTimeout(searchTimeout);
+            searchTimeout = setTimeout(function() {
+                document.getElementById('filterForm').submit();
+            }, 500);
+        });
+    }
+}
+
+// Filter functionality
+function initializeFilters() {
+    const filterElements = document.querySelectorAll('#priority, #project, #context, #completed');
+    filterElements.forEach(function(element) {
+        element.addEventListener('change', function() {
+            document.getElementById('filterForm').submit();
+        });
+    });
+}
+
+// Task selection functionality
+function initializeTaskSelection() {
+    // Update selected count on page load
+    updateSelectedCount();
+    
+    // Add event listeners to checkboxes
+    const taskCheckboxes = document.querySelectorAll('.task-checkbox');
+    taskCheckboxes.forEach(function(checkbox) {
+        checkbox.addEventListener('change', updateSelectedCount);
+    });
+    
+    // Add event listener to select all checkbox
+    const selectAllCheckbox = document.getElementById('selectAllCheckbox');
+    if (selectAllCheckbox) {
+        selectAllCheckbox.addEventListener('change', toggleAllTasks);
+    }
+}
+
+// Infinite scroll: fetch the next page of task rows when #loadMore comes into view
+function initializeInfiniteScroll() {
+    const sentinel = document.getElementById('loadMore');
+    if (!sentinel || typeof IntersectionObserver === 'undefined') {
+        return;
+    }
+    let loading = false;
+    
+    const observer = new IntersectionObserver(function(entries) {
+        if (!entries[0].isIntersecting || loading) {
+            return;
+        }
+        const cursor = sentinel.dataset.nextCursor;
+        if (!cursor) {
+            return;
+        }
+        loading = true;
+        
+        const params = new URLSearchParams(window.location.search);
+        params.set('partial', '1');
+        params.set('after', cursor);
+        fetch(window.location.pathname + '?' + params.toString(), {credentials: 'same-origin'})
+            .then(function(response) {
+                if (!response.ok) {
+                    throw new Error('HTTP ' + response.status);
+                }
+                const next = response.headers.get('X-Next-Cursor') || '';
+                return response.text().then(function(html) {
+                    return {html: html, next: next};
+                });
+            })
+            .then(function(page) {
+                appendTaskRows(page.html);
+                sentinel.dataset.nextCursor = page.next;
+                if (!page.next) {
+                    observer.disconnect();
+                    sentinel.remove();
+                }
+                updateTaskCount(!!page.next);
+            })
+            .catch(function() {
+                sentinel.textContent = 'Could not load more tasks.';
+                observer.disconnect();
+            })
+            .finally(function() {
+                loading = false;
+            });
+    }, {rootMargin: '400px'});
+    
+    observer.observe(sentinel);
+}
+
+function appendTaskRows(html) {
+    const tbody = document.querySelector('.table tbody');
+    if (!tbody) {
+        return;
+    }
+    const template = document.createElement('template');
+    template.innerHTML = html;
+    template.content.querySelectorAll('.task-checkbox').forEach(function(checkbox) {
+        checkbox.addEventListener('change', updateSelectedCount);
+    });
+    tbody.appendChild(template.content);
+}
+
+function updateTaskCount(hasMore) {
+    const countElement = document.getElementById('taskCount');
+    if (countElement) {
+        countElement.textContent = document.querySelectorAll('.task-row').length + (hasMore ? '+' : '');
+    }
+}
+
+// Live updates: apply task deltas from /events to the rendered list.
+// Beyond these sizes a full reload is cheaper than patching.
+const LIVE_MAX_GAP = 200;
+const LIVE_MAX_CHANGES = 300;
+const PRIORITY_RANK = {A: 0, B: 1, C: 2};
+let liveRevision = 0;
+
+function initializeLiveUpdates() {
+    const list = document.getElementById('taskList');
+    if (!list || typeof EventSource === 'undefined') {
+        return;
+    }
+    liveRevision = parseInt(list.dataset.revision, 10) || 0;
+    
+    const badge = document.getElementById('sse-status');
+    function setStatus(text, color) {
+        if (badge) {
+            badge.textContent = 'live: ' + text;
+            badge.className = 'badge ms-2 bg-' + color;
+            badge.style.fontSize = '0.6rem';
+        }
+    }
+    
+    let reloadTimer = null;
+    // The server replays what we missed since this revision; on reconnect
+    // the browser sends Last-Event-ID, which takes precedence.
+    const source = new EventSource('/events?since=' + liveRevision);
+    source.onopen = function() {
+        if (reloadTimer) {
+            clearTimeout(reloadTimer);
+            reloadTimer = null;
+        }
+        setStatus('connected', 'success');
+    };
+    source.addEventListener('resync', function() {
+        location.reload();
+    });
+    source.onmessage = function(e) {
+        let event;
+        try {
+            event = JSON.parse(e.data);
+        } catch (err) {
+            location.reload();
+            return;
+        }
+        handleLiveEvent(event);
+    };
+    source.onerror = function() {
+        setStatus('reconnecting…', 'warning');
+        // If onopen doesn't fire within 10s, force a reload to recover
+        if (!reloadTimer) {
+            reloadTimer = setTimeout(function() { location.reload(); }, 10000);
+        }
+    };
+}
+
+function handleLiveEvent(event) {
+    if (event.resync || event.id - liveRevision > LIVE_MAX_GAP) {
+        location.reload();
+    } else if (event.id <= liveRevision) {
+        // Already applied (e.g. by a catch-up fetch)
+    } else if (event.since > liveRevision) {
+        // Missed an event: fetch everything since our revision instead
+        catchUpTaskList();
+    } else {
+        applyTaskChanges(event);
+    }
+}
+
+function catchUpTaskList() {
+    fetch('/api/v2/changes?since=' + liveRevision, {credentials: 'same-origin'})
+        .then(function(response) {
+            if (!response.ok) {
+                throw new Error('HTTP ' + response.status);
+            }
+            return response.json();
+        })
+        .then(function(changes) {
+            if (changes.resync || changes.revision - liveRevision > LIVE_MAX_GAP) {
+                location.reload();
+                return;
+            }
+            changes.id = changes.revision;
+            applyTaskChanges(changes);
+        })
+        .catch(function() {
+            location.reload();
+        });
+}
+
+function applyTaskChanges(event) {
+    const tbody = document.querySelector('#taskList tbody');
+    const upserted = event.upserted || [];
+    const deleted = event.deleted || [];
+    if (upserted.length + deleted.length > LIVE_MAX_CHANGES || (!tbody && upserted.length)) {
+        // Too much to patch, or the empty-list placeholder has no table yet
+        location.reload();
+        return;
+    }
+    
+    if (tbody) {
+        deleted.forEach(function(id) {
+            const row = findTaskRow(tbody, id);
+            if (row) {
+                row.remove();
+            }
+        });
+        const filters = new URLSearchParams(window.location.search);
+        const hasMore = !!document.getElementById('loadMore');
+        upserted.forEach(function(task) {
+            const existing = findTaskRow(tbody, task.id);
+            const selected = existing && existing.querySelector('.task-checkbox').checked;
+            if (existing) {
+                existing.remove();
+            }
+            if (!taskMatchesFilters(task, filters)) {
+                return;
+            }
+            const row = buildTaskRow(task);
+            row.querySelector('.task-checkbox').checked = !!selected;
+            insertTaskRow(tbody, row, hasMore);
+            addFilterOptions(task);
+        });
+        updateSelectedCount();
+        updateTaskCount(hasMore);
+    }
+    
+    if (event.stats) {
+        updateStatsCounters(event.stats);
+    }
+    liveRevision = event.id;
+    document.getElementById('taskList').dataset.revision = liveRevision;
+}
+
+// Row and bulk actions: ask the form routes for JSON instead of a redirect
+// and a re-rendered page, then patch the list from the change feed.
+function initializeInlineActions() {
+    const list = document.getElementById('taskList');
+    if (!list || typeof fetch === 'undefined') {
+        return;
+    }
+    
+    list.addEventListener('click', function(e) {
+        const link = e.target.closest('a[href^="/complete/"], a[href^="/delete/"]');
+        // defaultPrevented: the delete confirmation was cancelled
+        if (!link || e.defaultPrevented) {
+            return;
+        }
+        e.preventDefault();
+        sendInlineAction(link.href, {}, link.href);
+    });
+    
+    const bulkForm = document.getElementById('bulkActionForm');
+    if (bulkForm) {
+        bulkForm.addEventListener('submit', function(e) {
+            e.preventDefault();
+            sendInlineAction(bulkForm.action, {method: 'POST', body: new FormData(bulkForm)})
+                .then(function(result) {
+                    if (result && result.changed === 0) {
+                        showToast('No selected tasks needed changing.', 'info');
+                    }
+                    clearSelection();
+                });
+        });
+    }
+}
+
+function sendInlineAction(url, options, fallbackUrl) {
+    options.credentials = 'same-origin';
+    options.headers = {'Accept': 'application/json', 'X-Requested-With': 'fetch'};
+    return fetch(url, options)
+        .then(function(response) {
+            if (response.status === 204) {
+                return {revision: parseInt(response.headers.get('X-Revision'), 10)};
+            }
+            return response.json().then(function(body) {
+                if (!response.ok) {
+                    throw new Error(body.error || 'HTTP ' + response.status);
+                }
+                return body;
+            });
+        })
+        .then(function(result) {
+            // The live stream may already have delivered this change
+            if (!(result.revision <= liveRevision)) {
+                catchUpTaskList();
+            }
+            return result;
+        })
+        .catch(function(err) {
+            if (fallbackUrl) {
+                window.location.href = fallbackUrl;
+            } else {
+                showToast(escapeHtml(err.message), 'danger');
+            }
+        });
+}
+
+function findTaskRow(tbody, id) {
+    return tbody.querySelector('.task-row[data-task-id="' + id + '"]');
+}
+
+// Mirrors the server's default order: incomplete first, then priority, then id
+function taskSortKey(completed, priority, id) {
+    const rank = priority in PRIORITY_RANK ? PRIORITY_RANK[priority] : 3;
+    return [completed ? 1 : 0, rank, id];
+}
+
+function rowSortKey(row) {
+    return taskSortKey(row.dataset.completed === '1', row.dataset.priority,
+                       parseInt(row.dataset.taskId, 10));
+}
+
+function compareSortKeys(a, b) {
+    for (let i = 0; i < a.length; i++) {
+        if (a[i] !== b[i]) {
+            return a[i] < b[i] ? -1 : 1;
+        }
+    }
+    return 0;
+}
+
+function insertTaskRow(tbody, row, hasMore) {
+    const key = rowSortKey(row);
+    const rows = tbody.querySelectorAll('.task-row');
+    for (let i = 0; i < rows.length; i++) {
+        if (compareSortKeys(key, rowSortKey(rows[i])) < 0) {
+            tbody.insertBefore(row, rows[i]);
+            return;
+        }
+    }
+    // Past the last loaded row: infinite scroll will fetch it with its page
+    if (!hasMore) {
+        tbody.appendChild(row);
+    }
+}
+
+// Client-side version of the dashboard filters.  Search is approximated
+// by case-insensitive substring matching on the description and tags.
+function taskMatchesFilters(task, filters) {
+    // list_priority is the column the server filters on: completed tasks
+    // keep their "(A)" in the line but have no priority in the list
+    const priority = filters.get('priority') || 'all';
+    if (priority === 'none' ? task.list_priority : (priority !== 'all' && task.list_priority !== priority)) {
+        return false;
+    }
+    const project = (filters.get('project') || 'all').toLowerCase();
+    if (project !== 'all' && task.projects.indexOf(project) === -1) {
+        return false;
+    }
+    const context = (filters.get('context') || 'all').toLowerCase();
+    if (context !== 'all' && task.contexts.indexOf(context) === -1) {
+        return false;
+    }
+    const completed = filters.get('completed') || 'all';
+    if ((completed === 'completed' && !task.completed) || (completed === 'incomplete' && task.completed)) {
+        return false;
+    }
+    const search = (filters.get('search') || '').toLowerCase().split(/\s+/).filter(Boolean);
+    const haystack = [task.description].concat(task.projects, task.contexts).join(' ').toLowerCase();
+    return search.every(function(word) {
+        const tags = word[0] === '+' ? task.projects : word[0] === '@' ? task.contexts : null;
+        if (tags) {
+            return tags.some(function(tag) { return tag.indexOf(word.slice(1)) === 0; });
+        }
+        return haystack.indexOf(word) !== -1;
+    });
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text == null ? '' : String(text);
+    return div.innerHTML;
+}
+
+// The description as shown in the list: raw_line minus completion marker,
+// priority and creation date (same steps as the todo.txt parser)
+function taskDisplayText(rawLine) {
+    let line = rawLine;
+    if (line.indexOf('x ') === 0) {
+        line = line.slice(2).replace(/^\d{4}-\d{2}-\d{2}\s+/, '');
+    }
+    return line.replace(/^\([A-Z]\)\s+/, '').replace(/^\d{4}-\d{2}-\d{2}\s+/, '').trim();
+}
+
+// Same markup as templates/task_rows.html
+function buildTaskRow(task) {
+    const id = task.id;
+    const done = task.completed;
+    const tr = document.createElement('tr');
+    tr.className = 'task-row' + (done ? ' table-success' : '');
+    tr.dataset.taskId = id;
+    tr.dataset.completed = done ? '1' : '0';
+    tr.dataset.priority = task.list_priority || '';
+    tr.innerHTML = `
+        <td>
+            <input type="checkbox" class="task-checkbox" name="task_ids" value="${id}" form="bulkActionForm">
+        </td>
+        <td>
+            ${done
+                ? '<span class="badge bg-success"><i class="bi bi-check-circle"></i> Done</span>'
+                : '<span class="badge bg-warning"><i class="bi bi-clock"></i> Pending</span>'}
+        </td>
+        <td>
+            ${task.priority
+                ? `<span class="badge priority-${task.priority.toLowerCase()}">(${escapeHtml(task.priority)})</span>`
+                : '<span class="text-muted">-</span>'}
+        </td>
+        <td>
+            <div class="task-description ${done ? 'text-decoration-line-through text-muted' : ''}">
+                ${escapeHtml(taskDisplayText(task.raw_line))}
+            </div>
+            ${task.completion_date ? `<small class="text-muted">Completed: ${escapeHtml(task.completion_date)}</small>` : ''}
+        </td>
+        <td>
+            ${task.projects.map(function(p) { return `<span class="badge bg-info text-dark me-1">+${escapeHtml(p)}</span>`; }).join('')}
+        </td>
+        <td>
+            ${task.contexts.map(function(c) { return `<span class="badge bg-secondary me-1">@${escapeHtml(c)}</span>`; }).join('')}
+        </td>
+        <td>
+            <small class="text-muted">${task.creation_date ? escapeHtml(task.creation_date) : '-'}</small>
+        </td>
+        <td>
+            <div class="btn-group btn-group-sm" role="group">
+                <a href="/complete/${id}" class="btn btn-outline-${done ? 'warning' : 'success'}"
+                   title="${done ? 'Mark as incomplete' : 'Mark as complete'}">
+                    <i class="bi bi-${done ? 'arrow-counterclockwise' : 'check'}"></i>
+                </a>
+                <a href="/edit/${id}" class="btn btn-outline-primary" title="Edit task">
+                    <i class="bi bi-pencil"></i>
+                </a>
+                <a href="/delete/${id}" class="btn btn-outline-danger" title="Delete task"
+                   onclick="return confirm('Are you sure you want to delete this task?')">
+                    <i class="bi bi-trash"></i>
+                </a>
+            </div>
+        </td>`;
+    tr.querySelector('.task-checkbox').addEventListener('change', updateSelectedCount);
+    return tr;
+}
+
+function addFilterOptions(task) {
+    [['project', '+', task.projects], ['context', '@', task.contexts]].forEach(function(spec) {
+        const select = document.getElementById(spec[0]);
+        if (!select) {
+            return;
+        }
+        spec[2].forEach(function(name) {
+            if (!select.querySelector('option[value="' + CSS.escape(name) + '"]')) {
+                const option = document.createElement('option');
+                option.value = name;
+                option.textContent = spec[1] + name;
+                select.appendChild(option);
+            }
+        });
+    });
+}
+
+function updateStatsCounters(stats) {
+    const values = {
+        statTotal: stats.total,
+        statCompleted: stats.completed,
+        statIncomplete: stats.incomplete,
+        statPrioritized: stats.priorities.A + stats.priorities.B + stats.priorities.C
+    };
+    Object.keys(values).forEach(function(id) {
+        const element = document.getElementById(id);
+        if (element) {
+            element.textContent = values[id];
+        }
+    });
+}
+
+// Keyboard shortcuts
+function initializeKeyboardShortcuts() {
+    document.addEventListener('keydown', function(e) {
+        // Ctrl+/ or Cmd+/ - Focus search
+        if ((e.ctrlKey || e.metaKey) && e.key === '/') {
+            e.preventDefault();
+            const searchInput = document.getElementById('search');
+            if (searchInput) {
+                searchInput.focus();
+                searchInput.select();
+            }
+        }
+        
+        // Ctrl+N or Cmd+N - New task (if on main page)
+        if ((e.ctrlKey || e.metaKey) && e.key === 'n' && window.location.pathname === '/') {
+            e.preventDefault();
+            window.location.href = '/add';
+        }
+        
+        // Escape - Clear search
+        if (e.key === 'Escape') {
+            const searchInput = document.getElementById('search');
+            if (searchInput && searchInput === document.activeElement) {
+                searchInput.value = '';
+                document.getElementById('filterForm').submit();
+            }
+        }
+    });
+}
+
+// Task selection functions
+function selectAllTasks() {
+    const taskCheckboxes = document.querySelectorAll('.task-checkbox');
+    taskCheckboxes.forEach(function(checkbox) {
+        checkbox.checked = true;
+    });
+    document.getElementById('selectAllCheckbox').checked = true;
+    updateSelectedCount();
+}
+
+function clearSelection() {
+    const taskCheckboxes = document.querySelectorAll('.task-checkbox');
+    taskCheckboxes.forEach(function(checkbox) {
+        checkbox.checked = false;
+    });
+    document.getElementById('selectAllCheckbox').checked = false;
+    updateSelectedCount();
+}
+
+function toggleAllTasks() {
+    const selectAllCheckbox = document.getElementById('selectAllCheckbox');
+    const taskCheckboxes = document.querySelectorAll('.task-checkbox');
+    
+    taskCheckboxes.forEach(function(checkbox) {
+        checkbox.checked = selectAllCheckbox.checked;
+    });
+    updateSelectedCount();
+}
+
+function updateSelectedCount() {
+    const selectedCount = document.querySelectorAll('.task-checkbox:checked').length;
+    const countElement = document.getElementById('selectedCount');
+    if (countElement) {
+        countElement.textContent = selectedCount;
+    }
+    
+    // Update select all checkbox state
+    const selectAllCheckbox = document.getElementById('selectAllCheckbox');
+    const totalCheckboxes = document.querySelectorAll('.task-checkbox').length;
+    
+    if (selectAllCheckbox && totalCheckboxes > 0) {
+        if (selectedCount === 0) {
+            selectAllCheckbox.indeterminate = false;
+            selectAllCheckbox.checked = false;
+        } else if (selectedCount === totalCheckboxes) {
+            selectAllCheckbox.indeterminate = false;
+            selectAllCheckbox.checked = true;
+        } else {
+            selectAllCheckbox.indeterminate = true;
+            selectAllCheckbox.checked = false;
+        }
+    }
+}
+
+// Bulk action confirmation
+function confirmBulkAction() {
+    const selectedCount = document.querySelectorAll('.task-checkbox:checked').length;
+    const actionSelect = document.querySelector('select[name="action"]');
+    
+    if (selectedCount === 0) {
+        alert('Please select at least one task.');
+        return false;
+    }
+    
+    if (!actionSelect || !actionSelect.value) {
+        alert('Please select an action.');
+        return false;
+    }
+    
+    const action = actionSelect.value;
+    let message = '';
+    
+    switch (action) {
+        case 'complete':
+            message = `Mark ${selectedCount} selected task(s) as complete?`;
+            break;
+        case 'uncomplete':
+            message = `Mark ${selectedCount} selected task(s) as incomplete?`;
+            break;
+        case 'delete':
+            message = `Delete ${selectedCount} selected task(s)? This action cannot be undone.`;
+            break;
+        default:
+            message = `Apply "${action}" to ${selectedCount} selected task(s)?`;
+    }
+    
+    return confirm(message);
+}
+
+// Task completion animation
+function animateTaskCompletion(taskRow) {
+    if (taskRow) {
+        taskRow.classList.add('task-completed');
+        setTimeout(function() {
+            taskRow.classList.remove('task-completed');
+        }, 300);
+    }
+}
+
+// Form validation helpers
+function validateForm(formElement) {
+    let isValid = true;
+    const requiredFields = formElement.querySelectorAll('[required]');
+    
+    requiredFields.forEach(function(field) {
+        if (!field.value.trim()) {
+            field.classList.add('is-invalid');
+            isValid = false;
+        } else {
+            field.classList.remove('is-invalid');
+            field.classList.add('is-valid');
+        }
+    });
+    
+    return isValid;
+}
+
+// Loading state management
+function setLoadingState(element, isLoading) {
+    if (isLoading) {
+        element.classList.add('loading');
+        element.disabled = true;
+    } else {
+        element.classList.remove('loading');
+        element.disabled = false;
+    }
+}
+
+// Toast notifications (if needed)
+function showToast(message, type = 'info') {
+    // Create toast element
+    const toast = document.createElement('div');
+    toast.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
+    toast.style.cssText = 'top: 20px; right: 20px; z-index: 9999; min-width: 300px;';
+    toast.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+    
+    // Add to page
+    document.body.appendChild(toast);
+    
+    // Auto-remove after 5 seconds
+    setTimeout(function() {
+        if (toast.parentNode) {
+            toast.parentNode.removeChild(toast);
+        }
+    }, 5000);
+}
+
+// Utility functions
+function debounce(func, wait) {
+    let timeout;
+    return function executedFunction(...args) {
+        const later = () => {
+            clearTimeout(timeout);
+            func(...args);
+        };
+        clearTimeout(timeout);
+        timeout = setTimeout(later, wait);
+    };
+}
+
+function throttle(func, limit) {
+    let inThrottle;
+    return function() {
+        const args = arguments;
+        const context = this;
+        if (!inThrottle) {
+            func.apply(context, args);
+            inThrottle = true;
+            setTimeout(() => inThrottle = false, limit);
+        }
+    };
+}
+
+// Export functions for use in templates
+window.TodoApp = {
+    selectAllTasks,
+    clearSelection,
+    toggleAllTasks,
+    updateSelectedCount,
+    confirmBulkAction,
+    animateTaskCompletion,
+    validateForm,
+    setLoadingState,
+    showToast
+};
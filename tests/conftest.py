@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# app.py reads its configuration at import time
+os.environ['TODO_FILES_DIR'] = tempfile.mkdtemp(prefix='todotxt-web-tests-')
+os.environ['TODO_SNAPSHOT_INTERVAL'] = '0'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
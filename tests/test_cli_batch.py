@@ -0,0 +1,60 @@
+import base64
+import importlib.util
+import os
+
+import pytest
+
+import app
+import todo_db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Response:
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.ok = 200 <= response.status_code < 300
+        self._json = response.get_json()
+
+    def json(self):
+        return self._json
+
+
+def _load_client(monkeypatch, path, name):
+    monkeypatch.setenv('TODO_URL', 'http://testserver')
+    monkeypatch.setenv('TODO_USER', 'batcher')
+    monkeypatch.setenv('TODO_PASS', 'secret1')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def server():
+    app.user_manager.create_user('batcher', 'batcher@example.com', 'secret1')
+    credentials = base64.b64encode(b'batcher:secret1').decode()
+    yield app.app.test_client(), {'Authorization': f'Basic {credentials}'}
+    app.user_manager.delete_user('batcher')
+
+
+@pytest.mark.parametrize('path', ['todo.py', 'cli/todo.py'])
+def test_batch_splits_ops_over_the_server_limit(monkeypatch, server, path):
+    client, headers = server
+    cli = _load_client(monkeypatch, path, 'todo_client_' + path.replace('/', '_')[:-3])
+    tdb = todo_db.TodoDb(app._user_db_path('batcher'))
+    ids = [tdb.add_task(f'task {n}', None, [], []).line_number for n in range(cli.BATCH_LIMIT + 100)]
+    completed = tdb.get_stats()['completed']
+    sizes = []
+
+    def api(method, path, json=None, **kwargs):
+        sizes.append(len(json['ops']))
+        return _Response(client.open(f'/api/v2{path}', method=method, json=json, headers=headers))
+
+    monkeypatch.setattr(cli, '_api', api)
+    results = cli._batch([{'op': 'complete', 'id': task_id} for task_id in ids])
+
+    assert sizes == [cli.BATCH_LIMIT, 100]
+    assert [r['id'] for r in results] == ids
+    assert all(r['ok'] and r['changed'] for r in results)
+    assert tdb.get_stats()['completed'] == completed + len(ids)
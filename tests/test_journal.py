@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+import todo_db
+
+
+@pytest.fixture
+def tdb(tmp_path):
+    db_path = str(tmp_path / 'todo.db')
+    todo_db.ensure_db(db_path)
+    return todo_db.TodoDb(db_path)
+
+
+def _completions_today(tdb):
+    today = date.today().isoformat()
+    return next(day['count'] for week in tdb.get_completion_heatmap()
+                for day in week['days'] if day['date'] == today)
+
+
+def _last_journal_id(tdb, operation):
+    with todo_db._db(tdb.db_path, readonly=True) as conn:
+        return conn.execute("SELECT max(id) FROM task_journal WHERE operation = ?",
+                            (operation,)).fetchone()[0]
+
+
+def test_restoring_bulk_complete_item_updates_heatmap(tdb):
+    first = tdb.add_task('first', None, [], []).line_number
+    second = tdb.add_task('second', None, [], []).line_number
+    assert tdb.complete_many([first, second]) == 2
+    assert _completions_today(tdb) == 2
+
+    assert tdb.restore_from_journal(_last_journal_id(tdb, 'bulk_complete'), first)
+
+    assert not tdb.get_task(first).completed
+    assert _completions_today(tdb) == 1
+
+
+def test_restoring_into_completed_state_counts_again(tdb):
+    task_id = tdb.add_task('task', None, [], []).line_number
+    tdb.complete_task(task_id)
+    tdb.uncomplete_task(task_id)
+    assert _completions_today(tdb) == 0
+
+    assert tdb.restore_from_journal(_last_journal_id(tdb, 'uncomplete'))
+
+    assert tdb.get_task(task_id).completed
+    assert _completions_today(tdb) == 1
+
+
+def test_restoring_a_deleted_completed_task_does_not_count_twice(tdb):
+    task_id = tdb.add_task('task', None, [], []).line_number
+    tdb.complete_task(task_id)
+    tdb.delete_task(task_id)
+
+    assert tdb.restore_from_journal(_last_journal_id(tdb, 'delete'))
+
+    assert tdb.get_task(task_id).completed
+    assert _completions_today(tdb) == 1
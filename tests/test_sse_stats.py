@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import live
+import sse_server
+
+
+class _Stream:
+    stats = None
+
+    def offer(self, frame, event_id):
+        pass
+
+
+def _session_cookie(username):
+    app = sse_server._cookie_app
+    serializer = app.session_interface.get_signing_serializer(app)
+    return f"{app.config['SESSION_COOKIE_NAME']}={serializer.dumps({'_user_id': username})}"
+
+
+def _get_stats(server, cookie=None):
+    async def request():
+        srv = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            head = 'GET /stats HTTP/1.1\r\nHost: x\r\n'
+            if cookie:
+                head += f'Cookie: {cookie}\r\n'
+            writer.write((head + '\r\n').encode())
+            response = await reader.read()
+            writer.close()
+        return json.loads(response.split(b'\r\n\r\n', 1)[1])
+    return asyncio.run(request())
+
+
+def test_stats_hide_usernames_without_a_session():
+    channels = live.SseChannels()
+    for username in ('alice', 'bob'):
+        channels.subscribe(username, 0, _Stream())
+    server = sse_server.SseServer(channels, user_manager=None)
+
+    anonymous = _get_stats(server)
+    assert anonymous['open_streams'] == 2
+    assert 'streams' not in anonymous
+    assert 'alice' not in json.dumps(anonymous)
+
+    own = _get_stats(server, _session_cookie('alice'))
+    assert [s['username'] for s in own['streams']] == ['alice']
@@ -0,0 +1,132 @@
+import base64
+
+import pytest
+
+import todo_db
+
+
+@pytest.fixture
+def tdb(tmp_path):
+    db_path = str(tmp_path / 'todo.db')
+    todo_db.ensure_db(db_path)
+    return todo_db.TodoDb(db_path)
+
+
+def _add(tdb, description, priority=None):
+    return tdb.add_task(description, priority, [], []).line_number
+
+
+def test_atomic_batch_rolls_back_on_first_error(tdb):
+    first = _add(tdb, 'first')
+    revision = tdb.revision
+
+    results, committed = tdb.apply_batch([
+        {'op': 'complete', 'id': first},
+        {'op': 'delete', 'id': 9999},
+        {'op': 'delete', 'id': first},
+    ])
+
+    assert not committed
+    assert [r['error'] for r in results] == ['Rolled back', 'Task not found', 'Not attempted']
+    assert not tdb.get_task(first).completed
+    assert tdb.revision == revision
+
+
+def test_best_effort_batch_keeps_successful_ops(tdb):
+    first, second = _add(tdb, 'first'), _add(tdb, 'second')
+
+    results, committed = tdb.apply_batch([
+        {'op': 'complete', 'id': first},
+        {'op': 'priority', 'id': 9999, 'priority': 'A'},
+        {'op': 'priority', 'id': second, 'priority': 'A'},
+        {'op': 'complete', 'id': first},
+    ], atomic=False)
+
+    assert committed
+    assert [r['ok'] for r in results] == [True, False, True, True]
+    assert results[1]['error'] == 'Task not found'
+    assert [r['changed'] for r in results] == [True, False, True, False]
+    assert tdb.get_task(first).completed
+    assert tdb.get_task(second).priority == 'A'
+
+
+def test_batch_update_uncompletes_before_setting_priority(tdb):
+    task_id = _add(tdb, 'foo', 'A')
+    tdb.complete_task(task_id)
+
+    results, committed = tdb.apply_batch([
+        {'op': 'update', 'id': task_id, 'completed': False, 'priority': 'B'},
+    ])
+
+    assert committed and results[0]['changed']
+    task = tdb.get_task(task_id)
+    assert not task.completed
+    assert task.priority == 'B'
+    assert task.raw_line.startswith('(B) ')
+
+
+@pytest.fixture
+def api():
+    import app
+    app.user_manager.create_user('tester', 'tester@example.com', 'secret1')
+    credentials = base64.b64encode(b'tester:secret1').decode()
+    yield app.app.test_client(), {'Authorization': f'Basic {credentials}'}
+    app.user_manager.delete_user('tester')
+
+
+def test_patch_uncomplete_keeps_requested_priority(api):
+    client, headers = api
+    created = client.post('/api/v2/tasks', headers=headers,
+                          json={'description': 'via api +foo', 'priority': 'A'})
+    assert created.status_code == 201
+    task_id = created.json['task']['id']
+    assert client.patch(f'/api/v2/tasks/{task_id}', headers=headers,
+                        json={'completed': True}).json['task']['completed']
+
+    response = client.patch(f'/api/v2/tasks/{task_id}', headers=headers,
+                            json={'completed': False, 'priority': 'B'})
+
+    assert response.status_code == 200
+    task = response.json['task']
+    assert not task['completed']
+    assert task['priority'] == 'B'
+    assert task['raw_line'].startswith('(B) ')
+    assert response.json['revision'] == client.get(
+        f'/api/v2/tasks/{task_id}', headers=headers).json['revision']
+
+
+def test_patch_unknown_task_is_404(api):
+    client, headers = api
+    response = client.patch('/api/v2/tasks/9999', headers=headers, json={'priority': 'A'})
+    assert response.status_code == 404
+    assert response.json == {'error': 'Task not found'}
+
+
+def test_completed_task_json_has_no_list_priority(api):
+    client, headers = api
+    created = client.post('/api/v2/tasks', headers=headers,
+                          json={'description': 'done soon', 'priority': 'A'})
+    task_id = created.json['task']['id']
+    assert created.json['task']['list_priority'] == 'A'
+
+    task = client.patch(f'/api/v2/tasks/{task_id}', headers=headers,
+                        json={'completed': True}).json['task']
+
+    # The line keeps "(A)" but the server sorts and filters it as unprioritized
+    assert task['priority'] == 'A'
+    assert task['list_priority'] is None
+    listed = client.get('/api/v2/tasks?priority=none', headers=headers).json['tasks']
+    assert task_id in [t['id'] for t in listed]
+
+
+def test_basic_auth_password_with_token_prefix():
+    import app
+    app.user_manager.create_user('prefixed', 'prefixed@example.com', 'tdt_secret1')
+    try:
+        credentials = base64.b64encode(b'prefixed:tdt_secret1').decode()
+        response = app.app.test_client().get(
+            '/api/v2/tasks', headers={'Authorization': f'Basic {credentials}'})
+        assert response.status_code == 200
+        assert app.user_manager.verify_credentials('prefixed', 'tdt_wrong') is None
+    finally:
+        app.user_manager.delete_user('prefixed')
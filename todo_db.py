@@ -1,15 +1,27 @@
+import html
+import json
 import os
 import re
 import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 from todo_parser import TodoTask
 
 _initialized: set = set()
+_fts_enabled: set = set()
 
-_SCHEMA = """
+# Position of a task's priority in the list ordering: A, B, C, then everything else
+_SORT_RANK = "CASE priority WHEN 'A' THEN 0 WHEN 'B' THEN 1 WHEN 'C' THEN 2 ELSE 3 END"
+
+# A completed task line with its completion date: "x YYYY-MM-DD ..."
+_COMPLETED_GLOB = "'x [0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'"
+
+_SCHEMA = f"""
 CREATE TABLE IF NOT EXISTS tasks (
     id              INTEGER PRIMARY KEY AUTOINCREMENT,
     completed       INTEGER NOT NULL DEFAULT 0,
@@ -19,7 +31,8 @@ CREATE TABLE IF NOT EXISTS tasks (
     description     TEXT NOT NULL DEFAULT '',
     raw_line        TEXT NOT NULL DEFAULT '',
     created_at      TEXT NOT NULL DEFAULT (datetime('now')),
-    updated_at      TEXT NOT NULL DEFAULT (datetime('now'))
+    updated_at      TEXT NOT NULL DEFAULT (datetime('now')),
+    sort_rank       INTEGER GENERATED ALWAYS AS ({_SORT_RANK}) VIRTUAL
 );
 
 CREATE TABLE IF NOT EXISTS task_projects (
@@ -45,20 +58,360 @@ CREATE TABLE IF NOT EXISTS task_journal (
     actor       TEXT,
     ts          TEXT NOT NULL DEFAULT (datetime('now'))
 );
+-- Small key/value store.  'revision' is the id of the newest journal entry,
+-- so it increases with every mutation and doubles as the ETag source.
+CREATE TABLE IF NOT EXISTS db_meta (
+    key    TEXT PRIMARY KEY,
+    value  INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO db_meta (key, value)
+    SELECT 'revision', coalesce(max(id), 0) FROM task_journal;
+-- Oldest revision the journal can still replay from (raised by compaction).
+INSERT OR IGNORE INTO db_meta (key, value) VALUES ('journal_floor', 0);
+CREATE TRIGGER IF NOT EXISTS trg_revision AFTER INSERT ON task_journal BEGIN
+    UPDATE db_meta SET value = new.id WHERE key = 'revision' AND value < new.id;
+END;
+-- Per-task before/after lines for batch journal entries (operation 'bulk_*'),
+-- so a single entry can still be restored one task at a time.
+CREATE TABLE IF NOT EXISTS task_journal_items (
+    journal_id  INTEGER NOT NULL REFERENCES task_journal(id) ON DELETE CASCADE,
+    task_id     INTEGER NOT NULL,
+    before_raw  TEXT,
+    after_raw   TEXT,
+    PRIMARY KEY (journal_id, task_id)
+);
+CREATE INDEX IF NOT EXISTS idx_journal_items_task ON task_journal_items(task_id);
 CREATE INDEX IF NOT EXISTS idx_journal_ts      ON task_journal(ts DESC);
 CREATE INDEX IF NOT EXISTS idx_journal_task_id ON task_journal(task_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_order     ON tasks(completed, sort_rank, id);
+
+-- Aggregate counters kept current by the triggers below so the dashboard
+-- never has to scan tasks. Keys: 'total', 'completed', 'priority:<A-Z|None>'
+-- (priority counts cover incomplete tasks only).
+CREATE TABLE IF NOT EXISTS task_stats (
+    key TEXT PRIMARY KEY,
+    n   INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO task_stats (key, n) VALUES ('total', 1)
+        ON CONFLICT(key) DO UPDATE SET n = n + 1;
+    INSERT INTO task_stats (key, n) SELECT 'completed', 1 WHERE new.completed = 1
+        ON CONFLICT(key) DO UPDATE SET n = n + 1;
+    INSERT INTO task_stats (key, n)
+        SELECT 'priority:' || coalesce(new.priority, 'None'), 1 WHERE new.completed = 0
+        ON CONFLICT(key) DO UPDATE SET n = n + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_delete AFTER DELETE ON tasks BEGIN
+    UPDATE task_stats SET n = n - 1 WHERE key = 'total';
+    UPDATE task_stats SET n = n - 1 WHERE key = 'completed' AND old.completed = 1;
+    UPDATE task_stats SET n = n - 1
+        WHERE key = 'priority:' || coalesce(old.priority, 'None') AND old.completed = 0;
+END;
+
+-- Completions per day (the completion date written into the task line) for
+-- the profile heatmap; maintained from the journal by the triggers below.
+CREATE TABLE IF NOT EXISTS completion_daily (
+    day   TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_completion_daily_complete AFTER INSERT ON task_journal
+WHEN new.operation = 'complete' AND new.after_raw GLOB {_COMPLETED_GLOB} BEGIN
+    INSERT INTO completion_daily (day, count) VALUES (substr(new.after_raw, 3, 10), 1)
+        ON CONFLICT(day) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_completion_daily_uncomplete AFTER INSERT ON task_journal
+WHEN new.operation = 'uncomplete' AND new.before_raw GLOB {_COMPLETED_GLOB} BEGIN
+    UPDATE completion_daily SET count = max(count - 1, 0)
+        WHERE day = substr(new.before_raw, 3, 10);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_completion_daily_bulk AFTER INSERT ON task_journal_items
+WHEN (SELECT operation FROM task_journal WHERE id = new.journal_id)
+        IN ('bulk_complete', 'bulk_uncomplete') BEGIN
+    INSERT INTO completion_daily (day, count)
+        SELECT substr(new.after_raw, 3, 10), 1 WHERE new.after_raw GLOB {_COMPLETED_GLOB}
+        ON CONFLICT(day) DO UPDATE SET count = count + 1;
+    UPDATE completion_daily SET count = max(count - 1, 0)
+        WHERE new.after_raw NOT GLOB {_COMPLETED_GLOB}
+          AND new.before_raw GLOB {_COMPLETED_GLOB}
+          AND day = substr(new.before_raw, 3, 10);
+END;
+
+-- A restore moves a task from before_raw (its line at the time; NULL when
+-- it had been deleted, which never left the rollup) to after_raw.
+CREATE TRIGGER IF NOT EXISTS trg_completion_daily_restore AFTER INSERT ON task_journal
+WHEN new.operation = 'restore' AND new.before_raw IS NOT NULL BEGIN
+    UPDATE completion_daily SET count = max(count - 1, 0)
+        WHERE new.before_raw GLOB {_COMPLETED_GLOB}
+          AND day = substr(new.before_raw, 3, 10);
+    INSERT INTO completion_daily (day, count)
+        SELECT substr(new.after_raw, 3, 10), 1 WHERE new.after_raw GLOB {_COMPLETED_GLOB}
+        ON CONFLICT(day) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_stats_update AFTER UPDATE OF completed, priority ON tasks
+WHEN old.completed IS NOT new.completed OR old.priority IS NOT new.priority BEGIN
+    UPDATE task_stats SET n = n - 1 WHERE key = 'completed' AND old.completed = 1;
+    UPDATE task_stats SET n = n - 1
+        WHERE key = 'priority:' || coalesce(old.priority, 'None') AND old.completed = 0;
+    INSERT INTO task_stats (key, n) SELECT 'completed', 1 WHERE new.completed = 1
+        ON CONFLICT(key) DO UPDATE SET n = n + 1;
+    INSERT INTO task_stats (key, n)
+        SELECT 'priority:' || coalesce(new.priority, 'None'), 1 WHERE new.completed = 0
+        ON CONFLICT(key) DO UPDATE SET n = n + 1;
+END;
 """
 
 
-@contextmanager
-def _db(db_path: str):
-    conn = sqlite3.connect(db_path)
+# Full-text search over description, projects and contexts.  task_fts uses
+# the default unicode61 tokenizer with prefix indexes for short "word*"
+# queries; task_fts_tri uses the trigram tokenizer for substring matches.
+# Both are keyed by rowid = tasks.id and kept in sync by the triggers below.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+    description, projects, contexts, prefix='1 2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS task_fts_tri USING fts5(
+    description, projects, contexts, tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO task_fts (rowid, description, projects, contexts)
+        VALUES (new.id, new.description, '', '');
+    INSERT INTO task_fts_tri (rowid, description, projects, contexts)
+        VALUES (new.id, new.description, '', '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_update AFTER UPDATE OF description ON tasks
+WHEN old.description IS NOT new.description BEGIN
+    UPDATE task_fts     SET description = new.description WHERE rowid = new.id;
+    UPDATE task_fts_tri SET description = new.description WHERE rowid = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_delete AFTER DELETE ON tasks BEGIN
+    DELETE FROM task_fts     WHERE rowid = old.id;
+    DELETE FROM task_fts_tri WHERE rowid = old.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_project_insert AFTER INSERT ON task_projects BEGIN
+    UPDATE task_fts SET projects = (SELECT group_concat(project, ' ') FROM task_projects
+        WHERE task_id = new.task_id) WHERE rowid = new.task_id;
+    UPDATE task_fts_tri SET projects = (SELECT group_concat(project, ' ') FROM task_projects
+        WHERE task_id = new.task_id) WHERE rowid = new.task_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_project_delete AFTER DELETE ON task_projects BEGIN
+    UPDATE task_fts SET projects = coalesce((SELECT group_concat(project, ' ') FROM task_projects
+        WHERE task_id = old.task_id), '') WHERE rowid = old.task_id;
+    UPDATE task_fts_tri SET projects = coalesce((SELECT group_concat(project, ' ') FROM task_projects
+        WHERE task_id = old.task_id), '') WHERE rowid = old.task_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_context_insert AFTER INSERT ON task_contexts BEGIN
+    UPDATE task_fts SET contexts = (SELECT group_concat(context, ' ') FROM task_contexts
+        WHERE task_id = new.task_id) WHERE rowid = new.task_id;
+    UPDATE task_fts_tri SET contexts = (SELECT group_concat(context, ' ') FROM task_contexts
+        WHERE task_id = new.task_id) WHERE rowid = new.task_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fts_context_delete AFTER DELETE ON task_contexts BEGIN
+    UPDATE task_fts SET contexts = coalesce((SELECT group_concat(context, ' ') FROM task_contexts
+        WHERE task_id = old.task_id), '') WHERE rowid = old.task_id;
+    UPDATE task_fts_tri SET contexts = coalesce((SELECT group_concat(context, ' ') FROM task_contexts
+        WHERE task_id = old.task_id), '') WHERE rowid = old.task_id;
+END;
+"""
+
+# Snippet markers; replaced with <mark> after the text has been HTML-escaped.
+_MARK_OPEN = "\x02"
+_MARK_CLOSE = "\x03"
+
+
+_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+def _connect(db_path: str, readonly: bool) -> sqlite3.Connection:
+    # Pooled connections move between request threads; the pool guarantees
+    # only one thread uses a connection at a time.
+    conn = sqlite3.connect(db_path, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    conn.execute("PRAGMA cache_size=-16000")
-    conn.execute("PRAGMA temp_store=MEMORY")
-    conn.execute("PRAGMA foreign_keys=ON")
+    if not readonly:
+        conn.execute("PRAGMA journal_mode=WAL")
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    if readonly:
+        conn.execute("PRAGMA query_only=ON")
+    return conn
+
+
+class _DbConnections:
+    """Warm connections for one database: idle readers plus a single writer."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.readers: List[sqlite3.Connection] = []
+        self.writer: Optional[sqlite3.Connection] = None
+        self.writer_lock = threading.Lock()
+        self.evicted = False
+
+    def close_idle(self) -> None:
+        for conn in self.readers:
+            conn.close()
+        self.readers = []
+        if self.writer is not None and self.writer_lock.acquire(blocking=False):
+            try:
+                self.writer.close()
+                self.writer = None
+            finally:
+                self.writer_lock.release()
+
+
+class ConnectionPool:
+    """Bounded, per-database pool of SQLite connections with LRU eviction.
+
+    Each database gets up to ``max_readers`` idle ``query_only`` reader
+    connections and one writer connection that is handed to a single
+    thread at a time.  When more than ``max_databases`` databases are
+    open, the least recently used one has its idle connections closed.
+    """
+
+    def __init__(self, max_databases: int = 64, max_readers: int = 4):
+        self.max_databases = max_databases
+        self.max_readers = max_readers
+        self._entries: "OrderedDict[str, _DbConnections]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entry(self, db_path: str) -> _DbConnections:
+        # Caller holds self._lock.
+        entry = self._entries.get(db_path)
+        if entry is None:
+            entry = self._entries[db_path] = _DbConnections(db_path)
+            while len(self._entries) > self.max_databases:
+                _, lru = self._entries.popitem(last=False)
+                lru.evicted = True
+                lru.close_idle()
+                self.evictions += 1
+        else:
+            self._entries.move_to_end(db_path)
+        return entry
+
+    def acquire_reader(self, db_path: str) -> sqlite3.Connection:
+        with self._lock:
+            entry = self._entry(db_path)
+            if entry.readers:
+                self.hits += 1
+                return entry.readers.pop()
+            self.misses += 1
+        return _connect(db_path, readonly=True)
+
+    def release_reader(self, db_path: str, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            entry = self._entries.get(db_path)
+            if entry is not None and len(entry.readers) < self.max_readers:
+                entry.readers.append(conn)
+                return
+        conn.close()
+
+    def acquire_writer(self, db_path: str) -> Tuple[_DbConnections, sqlite3.Connection]:
+        with self._lock:
+            entry = self._entry(db_path)
+        entry.writer_lock.acquire()
+        try:
+            with self._lock:
+                if entry.writer is not None:
+                    self.hits += 1
+                    return entry, entry.writer
+                self.misses += 1
+            entry.writer = _connect(db_path, readonly=False)
+            return entry, entry.writer
+        except Exception:
+            entry.writer_lock.release()
+            raise
+
+    def release_writer(self, entry: _DbConnections) -> None:
+        if entry.evicted and entry.writer is not None:
+            entry.writer.close()
+            entry.writer = None
+        entry.writer_lock.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'databases': len(self._entries),
+                'idle_readers': sum(len(e.readers) for e in self._entries.values()),
+            }
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            entry.evicted = True
+            entry.close_idle()
+
+
+_pool = ConnectionPool(
+    max_databases=int(os.environ.get('TODO_DB_POOL_SIZE', '64')),
+    max_readers=int(os.environ.get('TODO_DB_POOL_READERS', '4')),
+)
+
+# Reader connections checked out for the duration of the current request,
+# keyed by db_path.  Populated only between begin_request()/end_request().
+_request_local = threading.local()
+
+
+def pool_stats() -> dict:
+    """Return hit/miss/eviction counters for the shared connection pool."""
+    return _pool.stats()
+
+
+def begin_request() -> None:
+    """Start request scope: readers are held until end_request()."""
+    _request_local.readers = {}
+
+
+def end_request() -> None:
+    """Return any reader connections held by the current request to the pool."""
+    readers = getattr(_request_local, "readers", None)
+    _request_local.readers = None
+    if readers:
+        for db_path, conn in readers.items():
+            _pool.release_reader(db_path, conn)
+
+
+@contextmanager
+def _db(db_path: str, readonly: bool = False):
+    if readonly:
+        bound = getattr(_request_local, "readers", None)
+        if bound is not None:
+            conn = bound.get(db_path)
+            if conn is None:
+                conn = bound[db_path] = _pool.acquire_reader(db_path)
+            yield conn
+            return
+        conn = _pool.acquire_reader(db_path)
+        try:
+            yield conn
+        finally:
+            _pool.release_reader(db_path, conn)
+        return
+
+    entry, conn = _pool.acquire_writer(db_path)
     try:
         yield conn
         conn.commit()
@@ -66,25 +419,200 @@ def _db(db_path: str):
         conn.rollback()
         raise
     finally:
-        conn.close()
+        _pool.release_writer(entry)
 
 
 def ensure_db(db_path: str) -> None:
     if db_path in _initialized:
         return
     with _db(db_path) as conn:
+        new_rollup = not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name='completion_daily'"
+        ).fetchone()
+        columns = {r["name"] for r in conn.execute("PRAGMA table_xinfo(tasks)")}
+        if columns and "sort_rank" not in columns:
+            conn.execute(
+                f"ALTER TABLE tasks ADD COLUMN sort_rank INTEGER "
+                f"GENERATED ALWAYS AS ({_SORT_RANK}) VIRTUAL"
+            )
         conn.executescript(_SCHEMA)
+        if not conn.execute("SELECT 1 FROM task_stats WHERE key='total'").fetchone():
+            _rebuild_stats(conn)
+        if new_rollup:
+            _rebuild_completion_daily(conn)
+        try:
+            fresh = not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name='task_fts_tri'"
+            ).fetchone()
+            conn.executescript(_FTS_SCHEMA)
+            if fresh:
+                _rebuild_fts(conn)
+            _fts_enabled.add(db_path)
+        except sqlite3.OperationalError:
+            pass  # SQLite built without FTS5/trigram — search falls back to LIKE
     _initialized.add(db_path)
 
 
+def _rebuild_stats(conn) -> None:
+    """Recount task_stats from the tasks table (used when upgrading older DBs)."""
+    conn.execute("DELETE FROM task_stats")
+    conn.execute(
+        """INSERT INTO task_stats (key, n)
+           SELECT 'total', COUNT(*) FROM tasks
+           UNION ALL
+           SELECT 'completed', COUNT(*) FROM tasks WHERE completed = 1
+           UNION ALL
+           SELECT 'priority:' || coalesce(priority, 'None'), COUNT(*)
+           FROM tasks WHERE completed = 0 GROUP BY priority"""
+    )
+
+
+def _rebuild_completion_daily(conn) -> None:
+    """Backfill completion_daily by replaying complete/uncomplete/restore journal entries."""
+    conn.execute("DELETE FROM completion_daily")
+    conn.execute(
+        f"""INSERT INTO completion_daily (day, count)
+            SELECT day, sum(delta) FROM (
+                SELECT substr(after_raw, 3, 10) AS day, 1 AS delta FROM task_journal
+                WHERE operation = 'complete' AND after_raw GLOB {_COMPLETED_GLOB}
+                UNION ALL
+                SELECT substr(before_raw, 3, 10), -1 FROM task_journal
+                WHERE operation = 'uncomplete' AND before_raw GLOB {_COMPLETED_GLOB}
+                UNION ALL
+                SELECT substr(i.after_raw, 3, 10), 1
+                FROM task_journal_items i JOIN task_journal j ON j.id = i.journal_id
+                WHERE j.operation = 'bulk_complete' AND i.after_raw GLOB {_COMPLETED_GLOB}
+                UNION ALL
+                SELECT substr(i.before_raw, 3, 10), -1
+                FROM task_journal_items i JOIN task_journal j ON j.id = i.journal_id
+                WHERE j.operation = 'bulk_uncomplete' AND i.before_raw GLOB {_COMPLETED_GLOB}
+                UNION ALL
+                SELECT substr(after_raw, 3, 10), 1 FROM task_journal
+                WHERE operation = 'restore' AND before_raw IS NOT NULL
+                  AND after_raw GLOB {_COMPLETED_GLOB}
+                UNION ALL
+                SELECT substr(before_raw, 3, 10), -1 FROM task_journal
+                WHERE operation = 'restore' AND before_raw GLOB {_COMPLETED_GLOB}
+            )
+            GROUP BY day HAVING sum(delta) > 0"""
+    )
+
+
+def _rebuild_fts(conn) -> None:
+    """Repopulate both full-text indexes from tasks and the tag tables."""
+    for table in ("task_fts", "task_fts_tri"):
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            f"""INSERT INTO {table} (rowid, description, projects, contexts)
+                SELECT t.id, t.description,
+                       coalesce((SELECT group_concat(project, ' ') FROM task_projects
+                                 WHERE task_id = t.id), ''),
+                       coalesce((SELECT group_concat(context, ' ') FROM task_contexts
+                                 WHERE task_id = t.id), '')
+                FROM tasks t"""
+        )
+
+
+def _fts_query(search_term: str) -> Tuple[str, str]:
+    """Translate a search box term into (fts_table, MATCH expression).
+
+    Every whitespace-separated word must match.  A leading + or @ restricts
+    the word to projects or contexts.  Words of three or more characters
+    are substring matches on the trigram index; if any word is shorter the
+    unicode61 index is used with prefix matching instead, since trigrams
+    cannot match fewer than three characters.
+    """
+    words = []
+    for word in search_term.split():
+        column = None
+        if word[0] in "+@" and len(word) > 1:
+            column = "projects" if word[0] == "+" else "contexts"
+            word = word[1:]
+        words.append((column, word.replace('"', '""')))
+    use_trigram = all(len(w) >= 3 for _, w in words)
+    parts = []
+    for column, word in words:
+        phrase = f'"{word}"' if use_trigram else f'"{word}"*'
+        parts.append(f"{column} : {phrase}" if column else phrase)
+    return ("task_fts_tri" if use_trigram else "task_fts"), " AND ".join(parts)
+
+
+def _render_snippet(snippet: Optional[str]) -> Optional[str]:
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(_MARK_OPEN, "<mark>")
+        .replace(_MARK_CLOSE, "</mark>")
+    )
+
+
+def _encode_cursor(row, by_rank: bool) -> str:
+    if by_rank:
+        return f"r:{row['search_rank']!r}:{row['id']}"
+    return f"{row['completed']}:{row['sort_rank']}:{row['id']}"
+
+
+def _decode_cursor(cursor: str, by_rank: bool) -> tuple:
+    parts = cursor.split(":")
+    if by_rank:
+        if len(parts) != 3 or parts[0] != "r":
+            raise ValueError(f"invalid cursor: {cursor!r}")
+        return float(parts[1]), int(parts[2])
+    if len(parts) != 3:
+        raise ValueError(f"invalid cursor: {cursor!r}")
+    return tuple(int(p) for p in parts)
+
+
+def _fetch_tags(conn, task_ids: Optional[List[int]]) -> dict:
+    """Map task id -> (projects, contexts) in one query; None fetches every task's tags."""
+    if task_ids is None:
+        where, params = "", ()
+    else:
+        if not task_ids:
+            return {}
+        where = "WHERE task_id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(task_ids),) * 2
+    rows = conn.execute(
+        f"""SELECT task_id, 0 AS kind, project AS tag, rowid AS seq FROM task_projects {where}
+            UNION ALL
+            SELECT task_id, 1 AS kind, context AS tag, rowid AS seq FROM task_contexts {where}
+            ORDER BY kind, seq""",
+        params,
+    ).fetchall()
+    tags: dict = {}
+    for r in rows:
+        tags.setdefault(r["task_id"], ([], []))[r["kind"]].append(r["tag"])
+    return tags
+
+
+def _hydrate(conn, rows, all_tasks: bool = False) -> List[TodoTask]:
+    """Build TodoTask objects from tasks rows without re-parsing raw_line."""
+    tags = _fetch_tags(conn, None if all_tasks else [r["id"] for r in rows])
+    no_tags = ([], [])
+    tasks = []
+    for r in rows:
+        projects, contexts = tags.get(r["id"], no_tags)
+        task = TodoTask.from_fields(
+            r["raw_line"], r["id"], bool(r["completed"]), r["priority"],
+            r["creation_date"], r["completion_date"], r["description"],
+            projects, contexts,
+        )
+        task.list_priority = r["priority"]
+        tasks.append(task)
+    return tasks
+
+
 def has_tasks(db_path: str) -> bool:
     ensure_db(db_path)
-    with _db(db_path) as conn:
+    with _db(db_path, readonly=True) as conn:
         row = conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone()
     return row is not None
 
 
-def migrate_from_file(db_path: str, filepath: str) -> int:
+def migrate_from_file(
+    db_path: str, filepath: str, progress: Optional[Callable[[int, int], None]] = None
+) -> int:
     """One-time import from a todo.txt file. Returns number of tasks imported."""
     ensure_db(db_path)
     try:
@@ -92,28 +620,9 @@ def migrate_from_file(db_path: str, filepath: str) -> int:
             content = f.read()
     except FileNotFoundError:
         return 0
-    count = 0
     with _db(db_path) as conn:
-        for line in content.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            t = TodoTask(line)
-            task_id = conn.execute(
-                """INSERT INTO tasks (completed, priority, creation_date, completion_date,
-                   description, raw_line) VALUES (?, ?, ?, ?, ?, ?)""",
-                (
-                    1 if t.completed else 0,
-                    t.priority,
-                    t.creation_date,
-                    t.completion_date,
-                    t.get_clean_description(),
-                    t.raw_line,
-                ),
-            ).lastrowid
-            _insert_tags(conn, task_id, t.projects, t.contexts)
-            count += 1
-    return count
+        loaded = _bulk_load(conn, content.splitlines(), progress=progress)
+    return len(loaded)
 
 
 def create_sample_tasks(db_path: str) -> None:
@@ -182,22 +691,112 @@ def write_backup(db_path: str, backup_dir: str) -> str:
     stem = os.path.splitext(os.path.basename(db_path))[0]  # "todo_pmb"
     today = datetime.now().strftime("%Y-%m-%d")
     backup_file = os.path.join(backup_dir, f"{stem}_{today}.txt")
-    with _db(db_path) as conn:
+    with _db(db_path, readonly=True) as conn:
         rows = conn.execute("SELECT raw_line FROM tasks ORDER BY id").fetchall()
     content = "\n".join(r["raw_line"] for r in rows)
     if content:
         content += "\n"
-    with open(backup_file, "w", encoding="utf-8") as f:
-        f.write(content)
+    # Write to a temp file and rename so readers never see a partial backup
+    fd, tmp_path = tempfile.mkstemp(dir=backup_dir, prefix=f".{stem}_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, backup_file)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
     return backup_file
 
 
-def _log_journal(conn, task_id, operation: str, before_raw, after_raw, actor) -> None:
-    conn.execute(
+def backup_database(db_path: str, dest_path: str, pages: int = 256) -> None:
+    """Copy db_path to dest_path with the SQLite online backup API.
+
+    Pages are copied ``pages`` at a time from a read-only connection, so
+    writers are never blocked; SQLite restarts the copy if the database
+    changes mid-way, which keeps the result consistent.
+    """
+    dest = sqlite3.connect(dest_path)
+    try:
+        with _db(db_path, readonly=True) as src:
+            src.backup(dest, pages=pages, sleep=0.005)
+    finally:
+        dest.close()
+
+
+def restore_database(db_path: str, source_path: str, pages: int = 256) -> None:
+    """Overwrite db_path with the contents of the SQLite file at source_path.
+
+    The copy goes through the pooled writer connection, so it is a normal
+    write transaction: other connections see either the old or the
+    restored database, never a mix.
+    """
+    try:
+        previous = get_revision(db_path)
+    except sqlite3.OperationalError:  # missing or pre-revision database
+        previous = 0
+    src = sqlite3.connect(source_path)
+    try:
+        with _db(db_path) as dest:
+            src.backup(dest, pages=pages, sleep=0.005)
+    finally:
+        src.close()
+    _initialized.discard(db_path)
+    _fts_enabled.discard(db_path)
+    ensure_db(db_path)
+    # The snapshot's journal ends at an older revision; log the restore
+    # above the previous one so revisions (and ETags) never repeat.
+    with _db(db_path) as conn:
+        conn.execute(
+            """INSERT INTO task_journal (id, task_id, operation, before_raw, after_raw, actor)
+               SELECT max(coalesce(max(id), 0), ?) + 1, NULL, 'restore_db', NULL, NULL, NULL
+               FROM task_journal""",
+            (previous,),
+        )
+
+
+def get_revision(db_path: str) -> int:
+    """Return the database revision: the id of the newest journal entry."""
+    with _db(db_path, readonly=True) as conn:
+        row = conn.execute("SELECT value FROM db_meta WHERE key = 'revision'").fetchone()
+    return row[0] if row else 0
+
+
+def _log_journal(conn, task_id, operation: str, before_raw, after_raw, actor) -> int:
+    return conn.execute(
         """INSERT INTO task_journal (task_id, operation, before_raw, after_raw, actor)
            VALUES (?, ?, ?, ?, ?)""",
         (task_id, operation, before_raw, after_raw, actor),
+    ).lastrowid
+
+
+def _log_journal_batch(conn, operation: str, items: List[Tuple[int, Optional[str], Optional[str]]],
+                       actor) -> int:
+    """Record one journal entry for a set of (task_id, before_raw, after_raw) changes."""
+    journal_id = _log_journal(conn, None, operation, None, None, actor)
+    conn.executemany(
+        """INSERT INTO task_journal_items (journal_id, task_id, before_raw, after_raw)
+           VALUES (?, ?, ?, ?)""",
+        [(journal_id, task_id, before, after) for task_id, before, after in items],
     )
+    return journal_id
+
+
+def _uncompleted_raw(raw: str) -> Tuple[str, Optional[str]]:
+    """Strip the completion marker and date; return (raw_line, priority)."""
+    if raw.startswith("x "):
+        raw = raw[2:]
+        m = re.match(r"^\d{4}-\d{2}-\d{2}\s+", raw)
+        if m:
+            raw = raw[len(m.group(0)):]
+    pri_match = re.match(r"^\(([A-Z])\)\s+", raw)
+    return raw, (pri_match.group(1) if pri_match else None)
+
+
+def _with_priority(raw: str, priority: Optional[str]) -> str:
+    """Replace (or remove) the leading (A) priority of an incomplete task line."""
+    raw = re.sub(r"^\([A-Z]\)\s+", "", raw)
+    return f"({priority}) {raw}" if priority else raw
 
 
 def _insert_tags(conn, task_id: int, projects: List[str], contexts: List[str]) -> None:
@@ -221,12 +820,120 @@ def _insert_tags(conn, task_id: int, projects: List[str], contexts: List[str]) -
             seen_c.add(c)
 
 
+# Loads at least this large drop and rebuild secondary indexes, triggers,
+# task_stats and the FTS tables instead of maintaining them row by row.
+_BULK_DEFER_THRESHOLD = 2000
+_BULK_BATCH_SIZE = 5000
+
+
+@contextmanager
+def _deferred_maintenance(conn):
+    """Drop indexes and triggers on the task tables for a bulk load, then rebuild.
+
+    Runs inside one explicit transaction, so a failed load rolls the
+    schema back along with the data.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    # Triggers first, FTS tables last: the reverse order is safe to recreate.
+    saved = conn.execute(
+        """SELECT type, name, sql FROM sqlite_master
+           WHERE sql IS NOT NULL AND (
+               (type IN ('index', 'trigger')
+                AND tbl_name IN ('tasks', 'task_projects', 'task_contexts'))
+               OR (type = 'table' AND name IN ('task_fts', 'task_fts_tri')))
+           ORDER BY CASE type WHEN 'trigger' THEN 0 WHEN 'index' THEN 1 ELSE 2 END"""
+    ).fetchall()
+    for r in saved:
+        conn.execute(f"DROP {r['type'].upper()} {r['name']}")
+    yield
+    for r in reversed(saved):
+        conn.execute(r["sql"])
+    _rebuild_stats(conn)
+    if any(r["name"] == "task_fts_tri" for r in saved):
+        _rebuild_fts(conn)
+
+
+def _bulk_load(
+    conn,
+    lines: List[str],
+    progress: Optional[Callable[[int, int], None]] = None,
+    defer: Optional[bool] = None,
+) -> List[str]:
+    """Parse and insert todo.txt lines in batches with executemany.
+
+    Task ids are assigned up front so tag rows can be written in the same
+    batch.  ``defer`` (default: decided by size) wraps the load in
+    _deferred_maintenance.  ``progress(done, total)`` is called after each
+    batch.  Returns the raw lines that were loaded.
+    """
+    lines = [line.strip() for line in lines]
+    lines = [line for line in lines if line]
+    total = len(lines)
+    if defer is None:
+        defer = total >= _BULK_DEFER_THRESHOLD
+    if defer:
+        with _deferred_maintenance(conn):
+            return _bulk_insert(conn, lines, progress)
+    return _bulk_insert(conn, lines, progress)
+
+
+def _bulk_insert(conn, lines: List[str], progress) -> List[str]:
+    total = len(lines)
+    next_id = conn.execute(
+        """SELECT max(coalesce((SELECT seq FROM sqlite_sequence WHERE name = 'tasks'), 0),
+                      coalesce((SELECT max(id) FROM tasks), 0))"""
+    ).fetchone()[0] + 1
+    loaded: List[str] = []
+    for start in range(0, total, _BULK_BATCH_SIZE):
+        task_rows = []
+        project_rows = []
+        context_rows = []
+        for line in lines[start:start + _BULK_BATCH_SIZE]:
+            t = TodoTask(line)
+            task_rows.append((
+                next_id,
+                1 if t.completed else 0,
+                t.priority,
+                t.creation_date,
+                t.completion_date,
+                t.get_clean_description(),
+                t.raw_line,
+            ))
+            for p in dict.fromkeys(p.strip() for p in t.projects):
+                if p:
+                    project_rows.append((next_id, p))
+            for c in dict.fromkeys(c.strip() for c in t.contexts):
+                if c:
+                    context_rows.append((next_id, c))
+            loaded.append(t.raw_line)
+            next_id += 1
+        conn.executemany(
+            """INSERT INTO tasks (id, completed, priority, creation_date, completion_date,
+               description, raw_line) VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            task_rows,
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_projects (task_id, project) VALUES (?, ?)", project_rows
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_contexts (task_id, context) VALUES (?, ?)", context_rows
+        )
+        if progress:
+            progress(len(loaded), total)
+    return loaded
+
+
 def _sync_tags(conn, task_id: int, projects: List[str], contexts: List[str]) -> None:
     conn.execute("DELETE FROM task_projects WHERE task_id=?", (task_id,))
     conn.execute("DELETE FROM task_contexts WHERE task_id=?", (task_id,))
     _insert_tags(conn, task_id, projects, contexts)
 
 
+class _BatchAborted(Exception):
+    """Unwinds an atomic apply_batch so its transaction rolls back."""
+
+
 class TodoDb:
     def __init__(self, db_path: str):
         self.db_path = db_path
@@ -234,20 +941,50 @@ class TodoDb:
         self.actor = stem[5:] if stem.startswith('todo_') else stem
         ensure_db(db_path)
 
+    @property
+    def revision(self) -> int:
+        """Monotonic counter bumped by every mutation; cheap to read."""
+        return get_revision(self.db_path)
+
+    def etag(self, revision: Optional[int] = None) -> str:
+        """Strong entity tag for read endpoints, unique per user and revision."""
+        return f"{self.actor}-{self.revision if revision is None else revision}"
+
     def load_tasks(self) -> None:
         """No-op — kept for interface compatibility with TodoParser."""
         pass
 
     @property
     def tasks(self) -> List[TodoTask]:
-        with _db(self.db_path) as conn:
+        with _db(self.db_path, readonly=True) as conn:
             rows = conn.execute("SELECT * FROM tasks ORDER BY id").fetchall()
-        return [TodoTask(r["raw_line"], line_number=r["id"]) for r in rows]
+            return _hydrate(conn, rows, all_tasks=True)
+
+    def get_stats(self) -> dict:
+        """Return task counts from the trigger-maintained task_stats table.
+
+        Shape: {'total', 'completed', 'incomplete', 'priorities': {'A', 'B', 'C', 'None', ...}}
+        """
+        with _db(self.db_path, readonly=True) as conn:
+            rows = conn.execute("SELECT key, n FROM task_stats").fetchall()
+        counts = {r["key"]: r["n"] for r in rows}
+        total = counts.get('total', 0)
+        completed = counts.get('completed', 0)
+        priorities = {'A': 0, 'B': 0, 'C': 0, 'None': 0}
+        for key, n in counts.items():
+            if key.startswith('priority:') and n:
+                priorities[key[len('priority:'):]] = n
+        return {
+            'total': total,
+            'completed': completed,
+            'incomplete': total - completed,
+            'priorities': priorities,
+        }
 
     def get_task(self, task_id: int) -> Optional[TodoTask]:
-        with _db(self.db_path) as conn:
+        with _db(self.db_path, readonly=True) as conn:
             row = conn.execute("SELECT * FROM tasks WHERE id=?", (task_id,)).fetchone()
-        return TodoTask(row["raw_line"], line_number=row["id"]) if row else None
+            return _hydrate(conn, [row])[0] if row else None
 
     def add_task(
         self,
@@ -256,21 +993,8 @@ class TodoDb:
         projects: List[str] = None,
         contexts: List[str] = None,
     ) -> TodoTask:
-        creation_date = datetime.now().strftime("%Y-%m-%d")
-        inline_p = re.findall(r'(?<!\S)\+(\w+)', description)
-        inline_c = re.findall(r'(?<!\S)@(\w+)', description)
-        projects = list({p.lower() for p in (projects or []) + inline_p})
-        contexts = list({c.lower() for c in (contexts or []) + inline_c})
-        clean = _clean_desc(description)
-        raw = _build_raw_line(priority, creation_date, None, False, clean, projects, contexts)
         with _db(self.db_path) as conn:
-            task_id = conn.execute(
-                """INSERT INTO tasks (completed, priority, creation_date, description, raw_line)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (0, priority or None, creation_date, clean, raw),
-            ).lastrowid
-            _sync_tags(conn, task_id, projects, contexts)
-            _log_journal(conn, task_id, 'add', None, raw, self.actor)
+            task_id = self._add(conn, description, priority, projects, contexts)
         return self.get_task(task_id)
 
     def update_task(
@@ -281,78 +1005,322 @@ class TodoDb:
         projects: List[str] = None,
         contexts: List[str] = None,
     ) -> bool:
+        with _db(self.db_path) as conn:
+            return self._update(conn, task_id, description, priority, projects, contexts)
+
+    def update_fields(self, task_id: int, fields: dict) -> bool:
+        """Change any of description, priority, projects, contexts and
+        completed in one transaction; omitted fields keep their value.
+
+        Returns False if nothing changed or the task does not exist.
+        """
+        with _db(self.db_path) as conn:
+            row = conn.execute("SELECT * FROM tasks WHERE id=?", (task_id,)).fetchone()
+            if not row:
+                return False
+            return self._update_fields(conn, task_id, _hydrate(conn, [row])[0], fields)
+
+    def complete_task(self, task_id: int) -> bool:
+        with _db(self.db_path) as conn:
+            return self._complete(conn, task_id)
+
+    def uncomplete_task(self, task_id: int) -> bool:
+        with _db(self.db_path) as conn:
+            return self._uncomplete(conn, task_id)
+
+    def delete_task(self, task_id: int) -> bool:
+        with _db(self.db_path) as conn:
+            return self._delete(conn, task_id)
+
+    # Single-task changes against an open write transaction, shared by the
+    # methods above and apply_batch.  Each writes its own journal entry.
+
+    def _add(self, conn, description: str, priority: Optional[str],
+             projects: Optional[List[str]], contexts: Optional[List[str]]) -> int:
+        creation_date = datetime.now().strftime("%Y-%m-%d")
         inline_p = re.findall(r'(?<!\S)\+(\w+)', description)
         inline_c = re.findall(r'(?<!\S)@(\w+)', description)
         projects = list({p.lower() for p in (projects or []) + inline_p})
         contexts = list({c.lower() for c in (contexts or []) + inline_c})
         clean = _clean_desc(description)
-        with _db(self.db_path) as conn:
+        raw = _build_raw_line(priority, creation_date, None, False, clean, projects, contexts)
+        task_id = conn.execute(
+            """INSERT INTO tasks (completed, priority, creation_date, description, raw_line)
+               VALUES (?, ?, ?, ?, ?)""",
+            (0, priority or None, creation_date, clean, raw),
+        ).lastrowid
+        _sync_tags(conn, task_id, projects, contexts)
+        _log_journal(conn, task_id, 'add', None, raw, self.actor)
+        return task_id
+
+    def _update(self, conn, task_id: int, description: str, priority: Optional[str],
+                projects: Optional[List[str]], contexts: Optional[List[str]]) -> bool:
+        inline_p = re.findall(r'(?<!\S)\+(\w+)', description)
+        inline_c = re.findall(r'(?<!\S)@(\w+)', description)
+        projects = list({p.lower() for p in (projects or []) + inline_p})
+        contexts = list({c.lower() for c in (contexts or []) + inline_c})
+        clean = _clean_desc(description)
+        row = conn.execute("SELECT * FROM tasks WHERE id=?", (task_id,)).fetchone()
+        if not row:
+            return False
+        before_raw = row["raw_line"]
+        raw = _build_raw_line(
+            priority, row["creation_date"], row["completion_date"],
+            bool(row["completed"]), clean, projects, contexts,
+        )
+        conn.execute(
+            """UPDATE tasks SET description=?, priority=?, raw_line=?,
+               updated_at=datetime('now') WHERE id=?""",
+            (clean, priority or None, raw, task_id),
+        )
+        _sync_tags(conn, task_id, projects, contexts)
+        _log_journal(conn, task_id, 'update', before_raw, raw, self.actor)
+        return True
+
+    def _update_fields(self, conn, task_id: int, current: TodoTask, fields: dict) -> bool:
+        # Completed lines carry no priority, so uncomplete before applying
+        # the other fields and complete after them.
+        changed = False
+        toggle = 'completed' in fields and fields['completed'] != current.completed
+        if toggle and not fields['completed']:
+            changed = self._uncomplete(conn, task_id)
             row = conn.execute("SELECT * FROM tasks WHERE id=?", (task_id,)).fetchone()
-            if not row:
-                return False
-            before_raw = row["raw_line"]
-            raw = _build_raw_line(
-                priority, row["creation_date"], row["completion_date"],
-                bool(row["completed"]), clean, projects, contexts,
-            )
-            conn.execute(
-                """UPDATE tasks SET description=?, priority=?, raw_line=?,
-                   updated_at=datetime('now') WHERE id=?""",
-                (clean, priority or None, raw, task_id),
-            )
-            _sync_tags(conn, task_id, projects, contexts)
-            _log_journal(conn, task_id, 'update', before_raw, raw, self.actor)
+            current = _hydrate(conn, [row])[0]
+        if fields.keys() & {'description', 'priority', 'projects', 'contexts'}:
+            changed = self._update(
+                conn, task_id,
+                fields.get('description', current.get_clean_description()),
+                fields.get('priority', current.priority),
+                fields.get('projects', current.projects),
+                fields.get('contexts', current.contexts),
+            ) or changed
+        if toggle and fields['completed']:
+            changed = self._complete(conn, task_id) or changed
+        return changed
+
+    def _complete(self, conn, task_id: int) -> bool:
+        completion_date = datetime.now().strftime("%Y-%m-%d")
+        row = conn.execute(
+            "SELECT * FROM tasks WHERE id=? AND completed=0", (task_id,)
+        ).fetchone()
+        if not row:
+            return False
+        new_raw = f"x {completion_date} {row['raw_line']}"
+        conn.execute(
+            """UPDATE tasks SET completed=1, completion_date=?, priority=NULL, raw_line=?,
+               updated_at=datetime('now') WHERE id=?""",
+            (completion_date, new_raw, task_id),
+        )
+        _log_journal(conn, task_id, 'complete', row['raw_line'], new_raw, self.actor)
         return True
 
-    def complete_task(self, task_id: int) -> bool:
+    def _uncomplete(self, conn, task_id: int) -> bool:
+        row = conn.execute(
+            "SELECT * FROM tasks WHERE id=? AND completed=1", (task_id,)
+        ).fetchone()
+        if not row:
+            return False
+        before_raw = row["raw_line"]
+        raw, priority = _uncompleted_raw(before_raw)
+        conn.execute(
+            """UPDATE tasks SET completed=0, completion_date=NULL, priority=?, raw_line=?,
+               updated_at=datetime('now') WHERE id=?""",
+            (priority, raw, task_id),
+        )
+        _log_journal(conn, task_id, 'uncomplete', before_raw, raw, self.actor)
+        return True
+
+    def _delete(self, conn, task_id: int) -> bool:
+        row = conn.execute("SELECT raw_line FROM tasks WHERE id=?", (task_id,)).fetchone()
+        if not row:
+            return False
+        conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+        _log_journal(conn, task_id, 'delete', row['raw_line'], None, self.actor)
+        return True
+
+    def _set_priority(self, conn, task_id: int, priority: Optional[str]) -> bool:
+        """Set or clear the priority of an incomplete task; False if nothing changed."""
+        row = conn.execute(
+            "SELECT raw_line FROM tasks WHERE id=? AND completed=0", (task_id,)
+        ).fetchone()
+        if not row:
+            return False
+        raw = _with_priority(row["raw_line"], priority)
+        if raw == row["raw_line"]:
+            return False
+        conn.execute(
+            "UPDATE tasks SET priority=?, raw_line=?, updated_at=datetime('now') WHERE id=?",
+            (priority, raw, task_id),
+        )
+        _log_journal(conn, task_id, 'update', row["raw_line"], raw, self.actor)
+        return True
+
+    def apply_batch(self, ops: List[dict], atomic: bool = True) -> Tuple[List[dict], bool]:
+        """Apply an ordered list of operations in one write transaction.
+
+        Each op is a dict with 'op' (add, update, complete, uncomplete,
+        delete or priority), 'id' for all but add, and the task fields
+        it needs: add takes description, priority, projects, contexts and
+        completed; update takes any of those (the rest keep their value);
+        priority takes priority (None clears it).
+
+        Returns (results, committed).  Each result has 'op', 'ok', 'id',
+        'changed' and, while the task exists, its TodoTask as 'task'; failed
+        ops have 'error' instead.  A missing task is an error, while
+        completing a completed task is ok with changed False.  With
+        ``atomic`` the first error rolls the whole batch back and later ops
+        are not attempted; otherwise each op runs in its own savepoint and
+        only failed ones are undone.
+        """
+        results: List[dict] = []
+        try:
+            with _db(self.db_path) as conn:
+                # Open the transaction explicitly: a SAVEPOINT outside one
+                # would commit on RELEASE.
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                for op in ops:
+                    result = {'op': op['op'], 'id': op.get('id'), 'ok': True, 'changed': False}
+                    results.append(result)
+                    conn.execute("SAVEPOINT batch_op")
+                    try:
+                        self._apply_op(conn, op, result)
+                        error = None
+                    except LookupError:
+                        error = 'Task not found'
+                    except ValueError as e:
+                        error = str(e)
+                    except sqlite3.Error:
+                        error = 'Database error'
+                    if error:
+                        conn.execute("ROLLBACK TO batch_op")
+                        result.update(ok=False, changed=False, error=error)
+                        result.pop('task', None)
+                    conn.execute("RELEASE batch_op")
+                    if error and atomic:
+                        raise _BatchAborted()
+        except _BatchAborted:
+            for result in results[:-1]:
+                result.update(ok=False, changed=False, error='Rolled back')
+                result.pop('task', None)
+            for op in ops[len(results):]:
+                results.append({'op': op['op'], 'id': op.get('id'), 'ok': False,
+                                'changed': False, 'error': 'Not attempted'})
+            return results, False
+        return results, True
+
+    def _apply_op(self, conn, op: dict, result: dict) -> None:
+        kind = op['op']
+        if kind == 'add':
+            task_id = result['id'] = self._add(
+                conn, op['description'], op.get('priority'),
+                op.get('projects'), op.get('contexts'),
+            )
+            result['changed'] = True
+            if op.get('completed'):
+                self._complete(conn, task_id)
+        else:
+            task_id = op['id']
+            row = conn.execute("SELECT * FROM tasks WHERE id=?", (task_id,)).fetchone()
+            if not row:
+                raise LookupError(task_id)
+            if kind == 'update':
+                result['changed'] = self._update_fields(conn, task_id, _hydrate(conn, [row])[0], op)
+            elif kind == 'complete':
+                result['changed'] = self._complete(conn, task_id)
+            elif kind == 'uncomplete':
+                result['changed'] = self._uncomplete(conn, task_id)
+            elif kind == 'delete':
+                result['changed'] = self._delete(conn, task_id)
+            elif kind == 'priority':
+                result['changed'] = self._set_priority(conn, task_id, op.get('priority'))
+            else:
+                raise ValueError(f"Unknown op {kind!r}")
+        row = conn.execute("SELECT * FROM tasks WHERE id=?", (task_id,)).fetchone()
+        if row:
+            result['task'] = _hydrate(conn, [row])[0]
+
+    def _select_for_batch(self, conn, task_ids: List[int], where: str = "") -> list:
+        return conn.execute(
+            f"""SELECT id, raw_line FROM tasks
+                WHERE id IN (SELECT value FROM json_each(?)) {where} ORDER BY id""",
+            (json.dumps(list(task_ids)),),
+        ).fetchall()
+
+    def complete_many(self, task_ids: List[int]) -> int:
+        """Complete every incomplete task in task_ids in one transaction.
+
+        Records a single 'bulk_complete' journal entry whose items can be
+        restored individually.  Returns the number of tasks changed.
+        """
         completion_date = datetime.now().strftime("%Y-%m-%d")
         with _db(self.db_path) as conn:
-            row = conn.execute(
-                "SELECT * FROM tasks WHERE id=? AND completed=0", (task_id,)
-            ).fetchone()
-            if not row:
-                return False
-            new_raw = f"x {completion_date} {row['raw_line']}"
-            conn.execute(
+            rows = self._select_for_batch(conn, task_ids, "AND completed = 0")
+            if not rows:
+                return 0
+            items = [(r["id"], r["raw_line"], f"x {completion_date} {r['raw_line']}") for r in rows]
+            conn.executemany(
                 """UPDATE tasks SET completed=1, completion_date=?, priority=NULL, raw_line=?,
                    updated_at=datetime('now') WHERE id=?""",
-                (completion_date, new_raw, task_id),
+                [(completion_date, after, task_id) for task_id, _, after in items],
             )
-            _log_journal(conn, task_id, 'complete', row['raw_line'], new_raw, self.actor)
-        return True
+            _log_journal_batch(conn, 'bulk_complete', items, self.actor)
+        return len(items)
 
-    def uncomplete_task(self, task_id: int) -> bool:
+    def uncomplete_many(self, task_ids: List[int]) -> int:
+        """Mark every completed task in task_ids incomplete; see complete_many."""
         with _db(self.db_path) as conn:
-            row = conn.execute(
-                "SELECT * FROM tasks WHERE id=? AND completed=1", (task_id,)
-            ).fetchone()
-            if not row:
-                return False
-            before_raw = row["raw_line"]
-            raw = before_raw
-            if raw.startswith("x "):
-                raw = raw[2:]
-                m = re.match(r"^\d{4}-\d{2}-\d{2}\s+", raw)
-                if m:
-                    raw = raw[len(m.group(0)):]
-            pri_match = re.match(r"^\(([A-Z])\)\s+", raw)
-            priority = pri_match.group(1) if pri_match else None
-            conn.execute(
+            rows = self._select_for_batch(conn, task_ids, "AND completed = 1")
+            if not rows:
+                return 0
+            items = []
+            updates = []
+            for r in rows:
+                raw, priority = _uncompleted_raw(r["raw_line"])
+                items.append((r["id"], r["raw_line"], raw))
+                updates.append((priority, raw, r["id"]))
+            conn.executemany(
                 """UPDATE tasks SET completed=0, completion_date=NULL, priority=?, raw_line=?,
                    updated_at=datetime('now') WHERE id=?""",
-                (priority, raw, task_id),
+                updates,
             )
-            _log_journal(conn, task_id, 'uncomplete', before_raw, raw, self.actor)
-        return True
+            _log_journal_batch(conn, 'bulk_uncomplete', items, self.actor)
+        return len(items)
 
-    def delete_task(self, task_id: int) -> bool:
+    def delete_many(self, task_ids: List[int]) -> int:
+        """Delete every task in task_ids; see complete_many."""
         with _db(self.db_path) as conn:
-            row = conn.execute("SELECT raw_line FROM tasks WHERE id=?", (task_id,)).fetchone()
-            if not row:
-                return False
-            conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
-            _log_journal(conn, task_id, 'delete', row['raw_line'], None, self.actor)
-        return True
+            rows = self._select_for_batch(conn, task_ids)
+            if not rows:
+                return 0
+            conn.execute(
+                "DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([r["id"] for r in rows]),),
+            )
+            _log_journal_batch(
+                conn, 'bulk_delete', [(r["id"], r["raw_line"], None) for r in rows], self.actor
+            )
+        return len(rows)
+
+    def set_priority_many(self, task_ids: List[int], priority: Optional[str]) -> int:
+        """Set (or clear, with None) the priority of every incomplete task in task_ids."""
+        priority = priority.upper() if priority else None
+        with _db(self.db_path) as conn:
+            rows = self._select_for_batch(conn, task_ids, "AND completed = 0")
+            items = []
+            for r in rows:
+                raw = _with_priority(r["raw_line"], priority)
+                if raw != r["raw_line"]:
+                    items.append((r["id"], r["raw_line"], raw))
+            if not items:
+                return 0
+            conn.executemany(
+                """UPDATE tasks SET priority=?, raw_line=?, updated_at=datetime('now')
+                   WHERE id=?""",
+                [(priority, after, task_id) for task_id, _, after in items],
+            )
+            _log_journal_batch(conn, 'bulk_priority', items, self.actor)
+        return len(items)
 
     def get_filtered_tasks(
         self,
@@ -361,10 +1329,55 @@ class TodoDb:
         project_filter: str = "",
         context_filter: str = "",
         completed_filter: str = "",
+        order: str = "default",
     ) -> List[Tuple[int, TodoTask]]:
+        """Return every (id, task) pair matching the filters; see get_filtered_page."""
+        tasks, _ = self.get_filtered_page(
+            search_term, priority_filter, project_filter, context_filter,
+            completed_filter, order=order,
+        )
+        return tasks
+
+    def get_filtered_page(
+        self,
+        search_term: str = "",
+        priority_filter: str = "",
+        project_filter: str = "",
+        context_filter: str = "",
+        completed_filter: str = "",
+        order: str = "default",
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> Tuple[List[Tuple[int, TodoTask]], Optional[str]]:
+        """Return up to ``limit`` (id, task) pairs after cursor ``after``, plus the next cursor.
+
+        Pages are keyed on the list ordering (completed, priority rank, id),
+        which idx_tasks_order serves directly, so a page costs the same no
+        matter how deep into the list it is.  The next cursor is None on the
+        last page.  Raises ValueError for a malformed cursor.
+
+        With a search term and FTS5 available, each task also carries
+        ``search_rank`` (bm25, lower is better) and ``search_snippet`` (HTML
+        with <mark> highlights).  ``order="rank"`` sorts by relevance.
+        """
         conditions: List[str] = []
         params: List = []
         joins: List[str] = []
+        columns = "t.*"
+        search_term = search_term.strip()
+        use_fts = bool(search_term) and self.db_path in _fts_enabled
+        by_rank = use_fts and order == "rank"
+
+        if use_fts:
+            table, match = _fts_query(search_term)
+            joins.append(
+                f"""JOIN (SELECT rowid AS fts_id, bm25({table}) AS search_rank,
+                          snippet({table}, 0, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 24)
+                              AS search_snippet
+                   FROM {table} WHERE {table} MATCH ?) m ON m.fts_id = t.id"""
+            )
+            params.append(match)
+            columns = "t.*, m.search_rank, m.search_snippet"
 
         if project_filter and project_filter != "all":
             joins.append("JOIN task_projects tp ON tp.task_id = t.id")
@@ -388,81 +1401,206 @@ class TodoDb:
                 conditions.append("t.priority = ?")
                 params.append(priority_filter.upper())
 
-        if search_term:
+        if search_term and not use_fts:
             conditions.append("t.raw_line LIKE ?")
             params.append(f"%{search_term}%")
 
+        if after:
+            key = _decode_cursor(after, by_rank)
+            if by_rank:
+                conditions.append("(m.search_rank, t.id) > (?, ?)")
+            else:
+                conditions.append("(t.completed, t.sort_rank, t.id) > (?, ?, ?)")
+            params.extend(key)
+
         where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
         join_str = " ".join(joins)
+        if by_rank:
+            order_by = "m.search_rank ASC, t.id ASC"
+        else:
+            order_by = "t.completed ASC, t.sort_rank ASC, t.id ASC"
         query = f"""
-            SELECT DISTINCT t.* FROM tasks t {join_str} {where}
-            ORDER BY
-                t.completed ASC,
-                CASE t.priority WHEN 'A' THEN 0 WHEN 'B' THEN 1 WHEN 'C' THEN 2
-                    ELSE 3 END ASC,
-                t.id ASC
+            SELECT {columns} FROM tasks t {join_str} {where}
+            ORDER BY {order_by}
         """
-        with _db(self.db_path) as conn:
+        if limit is not None:
+            # Fetch one extra row to learn whether another page exists
+            query += " LIMIT ?"
+            params.append(limit + 1)
+        next_cursor = None
+        with _db(self.db_path, readonly=True) as conn:
             rows = conn.execute(query, params).fetchall()
-        return [(r["id"], TodoTask(r["raw_line"], line_number=r["id"])) for r in rows]
+            if limit is not None and len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = _encode_cursor(rows[-1], by_rank) if rows else None
+            tasks = _hydrate(conn, rows, all_tasks=not conditions and not joins and limit is None)
+        results = []
+        for r, task in zip(rows, tasks):
+            if use_fts:
+                task.search_rank = r["search_rank"]
+                task.search_snippet = _render_snippet(r["search_snippet"])
+            results.append((r["id"], task))
+        return results, next_cursor
 
     def get_all_projects(self) -> List[str]:
-        with _db(self.db_path) as conn:
+        with _db(self.db_path, readonly=True) as conn:
             rows = conn.execute(
                 "SELECT DISTINCT project FROM task_projects ORDER BY project"
             ).fetchall()
         return [r["project"] for r in rows]
 
     def get_all_contexts(self) -> List[str]:
-        with _db(self.db_path) as conn:
+        with _db(self.db_path, readonly=True) as conn:
             rows = conn.execute(
                 "SELECT DISTINCT context FROM task_contexts ORDER BY context"
             ).fetchall()
         return [r["context"] for r in rows]
 
     def get_journal(self, limit: int = 200) -> list:
-        with _db(self.db_path) as conn:
+        with _db(self.db_path, readonly=True) as conn:
             rows = conn.execute(
                 """SELECT id, task_id, operation, before_raw, after_raw, actor, ts
                    FROM task_journal ORDER BY ts DESC, id DESC LIMIT ?""",
                 (limit,),
             ).fetchall()
-        return [dict(r) for r in rows]
+            entries = [dict(r) for r in rows]
+            batch_ids = [e['id'] for e in entries if e['operation'].startswith('bulk_')]
+            if batch_ids:
+                items: dict = {}
+                for r in conn.execute(
+                    """SELECT journal_id, task_id, before_raw, after_raw
+                       FROM task_journal_items
+                       WHERE journal_id IN (SELECT value FROM json_each(?))
+                       ORDER BY journal_id, task_id""",
+                    (json.dumps(batch_ids),),
+                ):
+                    items.setdefault(r['journal_id'], []).append(dict(r))
+                for e in entries:
+                    if e['id'] in items:
+                        e['items'] = items[e['id']]
+        return entries
+
+    def get_changes(self, since: int) -> dict:
+        """Return what changed after revision ``since``, read from the journal.
+
+        The result has 'revision', 'upserted' (current TodoTask of every
+        task that still exists) and 'deleted' (ids).  'resync' is True, with
+        no task lists, when the journal cannot answer: ``since`` predates a
+        compaction or is ahead of this database, or the range includes a
+        replace_all or snapshot restore.
+        """
+        with _db(self.db_path, readonly=True) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM db_meta").fetchall())
+            revision = meta.get('revision', 0)
+            result = {'revision': revision, 'resync': False, 'upserted': [], 'deleted': []}
+            if since == revision:
+                return result
+            if since < meta.get('journal_floor', 0) or since > revision or conn.execute(
+                """SELECT 1 FROM task_journal
+                   WHERE id > ? AND operation IN ('replace_all', 'restore_db') LIMIT 1""",
+                (since,),
+            ).fetchone():
+                result['resync'] = True
+                return result
+            task_ids = [r[0] for r in conn.execute(
+                """SELECT task_id FROM task_journal WHERE id > ? AND task_id IS NOT NULL
+                   UNION
+                   SELECT task_id FROM task_journal_items WHERE journal_id > ?""",
+                (since, since),
+            )]
+            rows = conn.execute(
+                """SELECT * FROM tasks WHERE id IN (SELECT value FROM json_each(?))
+                   ORDER BY id""",
+                (json.dumps(task_ids),),
+            ).fetchall()
+            result['upserted'] = _hydrate(conn, rows)
+        present = {r["id"] for r in rows}
+        result['deleted'] = sorted(set(task_ids) - present)
+        return result
 
-    def restore_from_journal(self, journal_id: int) -> bool:
-        """Restore a task to its state before the given journal entry."""
+    def compact_journal(self, keep: int) -> int:
+        """Delete all but the newest ``keep`` journal entries; return the count removed.
+
+        Raises journal_floor so get_changes asks older clients to resync.
+        """
+        with _db(self.db_path) as conn:
+            cutoff = conn.execute(
+                "SELECT id FROM task_journal ORDER BY id DESC LIMIT 1 OFFSET ?", (keep,)
+            ).fetchone()
+            if not cutoff:
+                return 0
+            removed = conn.execute(
+                "DELETE FROM task_journal WHERE id <= ?", (cutoff[0],)
+            ).rowcount
+            conn.execute(
+                """UPDATE db_meta SET value = max(value, ?)
+                   WHERE key = 'journal_floor'""",
+                (cutoff[0],),
+            )
+        return removed
+
+    def restore_from_journal(self, journal_id: int, task_id: Optional[int] = None) -> bool:
+        """Restore a task to its state before the given journal entry.
+
+        For batch ('bulk_*') entries, restores only task_id when given,
+        otherwise every task in the batch.
+        """
         with _db(self.db_path) as conn:
             entry = conn.execute(
                 "SELECT * FROM task_journal WHERE id=?", (journal_id,)
             ).fetchone()
-            if not entry or not entry['before_raw'] or entry['operation'] in ('add', 'replace_all'):
+            if not entry or entry['operation'] in ('add', 'replace_all'):
                 return False
-            task_id = entry['task_id']
-            t = TodoTask(entry['before_raw'])
-            existing = conn.execute(
-                "SELECT id FROM tasks WHERE id=?", (task_id,)
-            ).fetchone()
-            if existing:
-                conn.execute(
-                    """UPDATE tasks SET completed=?, priority=?, creation_date=?,
-                       completion_date=?, description=?, raw_line=?,
-                       updated_at=datetime('now') WHERE id=?""",
-                    (1 if t.completed else 0, t.priority, t.creation_date,
-                     t.completion_date, t.get_clean_description(), t.raw_line, task_id),
-                )
-                _sync_tags(conn, task_id, t.projects, t.contexts)
+            if entry['operation'].startswith('bulk_'):
+                sql = "SELECT * FROM task_journal_items WHERE journal_id=?"
+                params: tuple = (journal_id,)
+                if task_id is not None:
+                    sql += " AND task_id=?"
+                    params += (task_id,)
+                items = [(r['task_id'], r['before_raw'], r['after_raw'])
+                         for r in conn.execute(sql, params) if r['before_raw']]
+            elif entry['before_raw']:
+                items = [(entry['task_id'], entry['before_raw'], entry['after_raw'])]
             else:
-                conn.execute(
-                    """INSERT INTO tasks (id, completed, priority, creation_date,
-                       completion_date, description, raw_line)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
-                    (task_id, 1 if t.completed else 0, t.priority, t.creation_date,
-                     t.completion_date, t.get_clean_description(), t.raw_line),
-                )
-                _insert_tags(conn, task_id, t.projects, t.contexts)
-            _log_journal(conn, task_id, 'restore', entry['after_raw'], entry['before_raw'], self.actor)
+                items = []
+            if not items:
+                return False
+            for item_task_id, before_raw, _ in items:
+                # Journal the line being replaced as it is now, which may
+                # differ from the entry's after_raw if the task changed since
+                current = conn.execute(
+                    "SELECT raw_line FROM tasks WHERE id=?", (item_task_id,)
+                ).fetchone()
+                self._restore_raw(conn, item_task_id, before_raw)
+                _log_journal(conn, item_task_id, 'restore',
+                             current['raw_line'] if current else None, before_raw, self.actor)
         return True
 
+    @staticmethod
+    def _restore_raw(conn, task_id: int, raw_line: str) -> None:
+        t = TodoTask(raw_line)
+        existing = conn.execute(
+            "SELECT id FROM tasks WHERE id=?", (task_id,)
+        ).fetchone()
+        if existing:
+            conn.execute(
+                """UPDATE tasks SET completed=?, priority=?, creation_date=?,
+                   completion_date=?, description=?, raw_line=?,
+                   updated_at=datetime('now') WHERE id=?""",
+                (1 if t.completed else 0, t.priority, t.creation_date,
+                 t.completion_date, t.get_clean_description(), t.raw_line, task_id),
+            )
+            _sync_tags(conn, task_id, t.projects, t.contexts)
+        else:
+            conn.execute(
+                """INSERT INTO tasks (id, completed, priority, creation_date,
+                   completion_date, description, raw_line)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (task_id, 1 if t.completed else 0, t.priority, t.creation_date,
+                 t.completion_date, t.get_clean_description(), t.raw_line),
+            )
+            _insert_tags(conn, task_id, t.projects, t.contexts)
+
     def get_completion_heatmap(self) -> list:
         """Return 52 weeks of daily completion counts for a GitHub-style heatmap.
 
@@ -474,15 +1612,12 @@ class TodoDb:
         current_week_sun = today - timedelta(days=(today.weekday() + 1) % 7)
         start = current_week_sun - timedelta(weeks=51)
 
-        with _db(self.db_path) as conn:
+        with _db(self.db_path, readonly=True) as conn:
             rows = conn.execute(
-                """SELECT date(ts) AS day, COUNT(*) AS cnt
-                   FROM task_journal
-                   WHERE operation = 'complete' AND date(ts) >= ?
-                   GROUP BY day""",
+                "SELECT day, count FROM completion_daily WHERE day >= ? AND count > 0",
                 (start.isoformat(),),
             ).fetchall()
-        counts = {r['day']: r['cnt'] for r in rows}
+        counts = {r['day']: r['count'] for r in rows}
 
         weeks = []
         prev_month = None
@@ -502,38 +1637,31 @@ class TodoDb:
 
     def to_todo_txt(self) -> str:
         """Export all tasks as todo.txt content using stored raw_line."""
-        with _db(self.db_path) as conn:
+        with _db(self.db_path, readonly=True) as conn:
             rows = conn.execute("SELECT raw_line FROM tasks ORDER BY id").fetchall()
         lines = [r["raw_line"] for r in rows]
         return "\n".join(lines) + ("\n" if lines else "")
 
-    def replace_from_txt(self, content: str) -> int:
-        """Replace all tasks from todo.txt content. Returns count imported."""
-        count = 0
+    def replace_from_txt(
+        self, content: str, progress: Optional[Callable[[int, int], None]] = None
+    ) -> int:
+        """Replace all tasks from todo.txt content. Returns count imported.
+
+        ``progress(done, total)`` is called after each batch of the load.
+        """
+        lines = content.splitlines()
         with _db(self.db_path) as conn:
             old_rows = conn.execute("SELECT raw_line FROM tasks ORDER BY id").fetchall()
             before_raw = "\n".join(r["raw_line"] for r in old_rows) or None
-            conn.execute("DELETE FROM tasks")
-            after_lines = []
-            for line in content.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                t = TodoTask(line)
-                task_id = conn.execute(
-                    """INSERT INTO tasks (completed, priority, creation_date, completion_date,
-                       description, raw_line) VALUES (?, ?, ?, ?, ?, ?)""",
-                    (
-                        1 if t.completed else 0,
-                        t.priority,
-                        t.creation_date,
-                        t.completion_date,
-                        t.get_clean_description(),
-                        t.raw_line,
-                    ),
-                ).lastrowid
-                _insert_tags(conn, task_id, t.projects, t.contexts)
-                after_lines.append(t.raw_line)
-                count += 1
+            defer = max(len(old_rows), len(lines)) >= _BULK_DEFER_THRESHOLD
+            if defer:
+                with _deferred_maintenance(conn):
+                    conn.execute("DELETE FROM task_projects")
+                    conn.execute("DELETE FROM task_contexts")
+                    conn.execute("DELETE FROM tasks")
+                    after_lines = _bulk_load(conn, lines, progress=progress, defer=False)
+            else:
+                conn.execute("DELETE FROM tasks")
+                after_lines = _bulk_load(conn, lines, progress=progress, defer=False)
             _log_journal(conn, None, 'replace_all', before_raw, "\n".join(after_lines) or None, self.actor)
-        return count
+        return len(after_lines)
@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 
 class TodoTask:
-    def __init__(self, line: str, line_number: int = 0):
+    def __init__(self, line: str, line_number: int = 0, parse: bool = True):
         self.line_number = line_number
         self.raw_line = line.strip()
         self.completed = False
@@ -13,9 +13,74 @@ class TodoTask:
         self.description = ""
         self.projects = []
         self.contexts = []
-        self.key_values = {}
+        self._key_values = None
+        self._clean_description = None
+        # Set by TodoDb.get_filtered_tasks when a full-text search matched
+        self.search_rank = None
+        self.search_snippet = None
+        # The tasks.priority column the list is sorted and filtered by (set
+        # by _hydrate); unlike priority it is None for completed tasks
+        self.list_priority = None
         
-        self._parse_line()
+        if parse:
+            self._parse_line()
+    
+    @classmethod
+    def from_fields(cls, raw_line: str, line_number: int, completed: bool,
+                    priority: Optional[str], creation_date: Optional[str],
+                    completion_date: Optional[str], clean_description: str,
+                    projects: List[str], contexts: List[str]) -> 'TodoTask':
+        """Build a task from already-parsed fields (e.g. database columns).
+        
+        Only cheap prefix checks are done on raw_line to recover the
+        description; if the fields do not line up with raw_line the line is
+        parsed normally instead.
+        """
+        task = cls(raw_line, line_number, parse=False)
+        line = task.raw_line
+        
+        if completed:
+            if not line.startswith('x '):
+                return cls(raw_line, line_number)
+            line = line[2:]
+            if completion_date:
+                if not line.startswith(completion_date):
+                    return cls(raw_line, line_number)
+                line = line[len(completion_date):].lstrip()
+        
+        # Completed tasks keep their old "(A)" after the completion date,
+        # which the parser reports as the priority.
+        if len(line) > 3 and line[0] == '(' and line[2] == ')' and 'A' <= line[1] <= 'Z' and line[3].isspace():
+            priority = line[1]
+            line = line[4:].lstrip()
+        elif priority:
+            return cls(raw_line, line_number)
+        
+        if creation_date:
+            if not line.startswith(creation_date):
+                return cls(raw_line, line_number)
+            line = line[len(creation_date):].lstrip()
+        
+        task.completed = completed
+        task.priority = priority
+        task.creation_date = creation_date
+        task.completion_date = completion_date
+        task.description = line.strip()
+        task.projects = list(projects)
+        task.contexts = list(contexts)
+        task._clean_description = clean_description
+        return task
+    
+    @property
+    def key_values(self) -> Dict[str, str]:
+        """key:value pairs in the description (parsed on first access)"""
+        if self._key_values is None:
+            self._key_values = dict(re.findall(r'(\w+):(\w+)', self.description))
+        return self._key_values
+    
+    @key_values.setter
+    def key_values(self, value: Dict[str, str]):
+        self._key_values = value
     
     def _parse_line(self):
         """Parse a todo.txt line into its components"""
@@ -59,6 +124,8 @@ class TodoTask:
     
     def get_clean_description(self) -> str:
         """Get description with projects and contexts stripped out"""
+        if self._clean_description is not None:
+            return self._clean_description
         clean_desc = self.description
         # Remove +project tags
         clean_desc = re.sub(r'\s*\+\w+', '', clean_desc)
@@ -1,9 +1,74 @@
 import json
 import hashlib
+import hmac
 import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from flask_login import UserMixin
 
+# Prefix of API tokens, so they can be told apart from passwords
+TOKEN_PREFIX = 'tdt_'
+
+
+class TtlLruCache:
+    """Bounded map whose entries expire ``ttl`` seconds after being stored.
+
+    When full, the least recently used entry is evicted.  Thread-safe.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_value(self, value):
+        """Drop every entry whose value is ``value``."""
+        with self._lock:
+            for key in [k for k, v in self._entries.items() if v[1] == value]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
 class User(UserMixin):
     def __init__(self, username, email, password_hash=None):
         self.id = username
@@ -12,6 +77,8 @@ class User(UserMixin):
         self.password_hash = password_hash
         self.created_at = datetime.now().isoformat()
         self.last_login = None
+        # API tokens: dicts of id, name, prefix, token_hash, created_at
+        self.api_tokens = []
     
     def check_password(self, password):
         """Check if provided password matches the stored hash"""
@@ -33,7 +100,8 @@ class User(UserMixin):
             'email': self.email,
             'password_hash': self.password_hash,
             'created_at': self.created_at,
-            'last_login': self.last_login
+            'last_login': self.last_login,
+            'api_tokens': self.api_tokens
         }
     
     @classmethod
@@ -42,10 +110,19 @@ class User(UserMixin):
         user = cls(data['username'], data['email'], data['password_hash'])
         user.created_at = data.get('created_at', datetime.now().isoformat())
         user.last_login = data.get('last_login')
+        user.api_tokens = data.get('api_tokens', [])
         return user
 
 class UserManager:
-    def __init__(self, users_file='users.json', todo_dir=None):
+    """Users, stored in users.json.
+
+    Logins only update ``last_login`` in memory and mark the users dirty; a
+    background thread writes users.json at most every ``flush_interval``
+    seconds, and stop() writes whatever is left at shutdown.  Account
+    changes (new users, tokens) are written immediately.
+    """
+
+    def __init__(self, users_file='users.json', todo_dir=None, flush_interval=None):
         # Configure todo files directory from environment variable or default to current directory
         if todo_dir is None:
             self.todo_dir = os.environ.get('TODO_FILES_DIR', os.getcwd())
@@ -55,6 +132,30 @@ class UserManager:
         # Store users.json in the same directory as todo data files
         self.users_file = os.path.join(self.todo_dir, users_file)
         self.users = {}
+
+        if flush_interval is None:
+            flush_interval = float(os.environ.get('TODO_LOGIN_FLUSH_INTERVAL', '30'))
+        self.flush_interval = flush_interval
+        # Guards the dirty flag and the snapshot taken for a save; held
+        # only briefly, so logins never wait on disk
+        self._lock = threading.Lock()
+        # Serialises writes of users.json
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._stop_flushing = threading.Event()
+        self._flusher = None
+        self.flushes = 0
+        self.errors = 0
+
+        # Verified API tokens (token hash -> username) and basic auth
+        # credentials (keyed digest -> username), so repeat API calls skip
+        # the lookup and password hash until the entry expires
+        cache_size = int(os.environ.get('TODO_AUTH_CACHE_SIZE', '1024'))
+        cache_ttl = float(os.environ.get('TODO_AUTH_CACHE_TTL', '300'))
+        self.token_cache = TtlLruCache(cache_size, cache_ttl)
+        self.credential_cache = TtlLruCache(cache_size, cache_ttl)
+        # Never persisted: cached credentials die with the process
+        self._credential_key = secrets.token_bytes(32)
         
         # Ensure the todo directory exists
         os.makedirs(self.todo_dir, exist_ok=True)
@@ -74,34 +175,93 @@ class UserManager:
                 self.users = {}
     
     def save_users(self):
-        """Save users to JSON file"""
-        users_data = {}
-        for username, user in self.users.items():
-            users_data[username] = user.to_dict()
-        
-        with open(self.users_file, 'w', encoding='utf-8') as f:
-            json.dump(users_data, f, indent=2, ensure_ascii=False)
+        """Save users to JSON file, atomically (temp file then rename)"""
+        with self._save_lock:
+            with self._lock:
+                users_data = {}
+                for username, user in list(self.users.items()):
+                    users_data[username] = user.to_dict()
+                self._dirty = False
+            fd, tmp_path = tempfile.mkstemp(dir=self.todo_dir, prefix='.users_', suffix='.json.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(users_data, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.users_file)
+            except BaseException:
+                with self._lock:
+                    self._dirty = True
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def _mark_dirty(self):
+        """Schedule a write of users.json by the flusher thread."""
+        with self._lock:
+            self._dirty = True
+            if self.flush_interval <= 0:
+                flush_now = True
+            else:
+                flush_now = False
+                if self._flusher is None and not self._stop_flushing.is_set():
+                    self._flusher = threading.Thread(target=self._run_flusher,
+                                                     name='users-flusher', daemon=True)
+                    self._flusher.start()
+        if flush_now:
+            self.flush()
+
+    def _run_flusher(self):
+        while not self._stop_flushing.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                self.errors += 1  # still dirty; retried on the next tick
+
+    def flush(self):
+        """Write users.json if there are unsaved login updates."""
+        with self._lock:
+            if not self._dirty:
+                return
+        self.save_users()
+        self.flushes += 1
+
+    def stop(self):
+        """Stop the flusher thread and write any unsaved login updates."""
+        self._stop_flushing.set()
+        with self._lock:
+            flusher = self._flusher
+        if flusher is not None:
+            flusher.join(5)
+        self.flush()
     
-    def create_user(self, username, email, password):
-        """Create a new user"""
-        if username in self.users:
-            return None, "Username already exists"
+    def _validate_new_user(self, username, email, password):
+        """Error message for a registration, or None if it is acceptable"""
+        if self.get_user(username):
+            return "Username already exists"
         
         if self.get_user_by_email(email):
-            return None, "Email already registered"
+            return "Email already registered"
         
         # Validate input
         if not username or not email or not password:
-            return None, "All fields are required"
+            return "All fields are required"
         
         if len(username) < 3:
-            return None, "Username must be at least 3 characters"
+            return "Username must be at least 3 characters"
         
         if len(password) < 6:
-            return None, "Password must be at least 6 characters"
+            return "Password must be at least 6 characters"
         
         if '@' not in email:
-            return None, "Invalid email address"
+            return "Invalid email address"
+        return None
+
+    def create_user(self, username, email, password):
+        """Create a new user"""
+        error = self._validate_new_user(username, email, password)
+        if error:
+            return None, error
         
         # Create user
         user = User(username, email)
@@ -113,18 +273,120 @@ class UserManager:
     
     def authenticate_user(self, username, password):
         """Authenticate user with username and password"""
-        user = self.users.get(username)
+        user = self.get_user(username)
         if user and user.check_password(password):
-            # Update last login
-            user.last_login = datetime.now().isoformat()
-            self.save_users()
+            self._record_login(user)
             return user
         return None
+
+    def _record_login(self, user):
+        # Written by the flusher, off the request path
+        user.last_login = datetime.now().isoformat()
+        self._mark_dirty()
     
+    def verify_credentials(self, username, password):
+        """Authenticate an API request's basic auth through the credential cache.
+
+        The password may also be one of the user's API tokens.  A password
+        that only looks like a token is still checked as a password.
+        """
+        if password.startswith(TOKEN_PREFIX):
+            user = self.verify_token(password)
+            if user and user.username == username:
+                return user
+        key = hmac.new(self._credential_key, f"{username}\0{password}".encode('utf-8'),
+                       hashlib.sha256).digest()
+        cached = self.credential_cache.get(key)
+        if cached is not None:
+            return self.get_user(cached)
+        user = self.authenticate_user(username, password)
+        if user:
+            self.credential_cache.put(key, user.username)
+        return user
+
+    @staticmethod
+    def _hash_token(token):
+        # Tokens are random, so a fast hash is enough to keep them unusable at rest
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _new_token(cls, name):
+        """Generate a token named ``name``: (token, info) or (None, error)"""
+        name = (name or '').strip()
+        if not name:
+            return None, "Token name is required"
+        if len(name) > 64:
+            return None, "Token name must be at most 64 characters"
+        token = TOKEN_PREFIX + secrets.token_urlsafe(30)
+        return token, {
+            'id': secrets.token_hex(4),
+            'name': name,
+            'prefix': token[:len(TOKEN_PREFIX) + 4],
+            'token_hash': cls._hash_token(token),
+            'created_at': datetime.now().isoformat(),
+        }
+
+    def create_token(self, username, name):
+        """Create an API token for a user; return (token, info) or (None, error).
+
+        The token itself is only returned here; just its hash is stored.
+        """
+        user = self.users.get(username)
+        if not user:
+            return None, "User not found"
+        token, info = self._new_token(name)
+        if token is None:
+            return None, info
+        user.api_tokens.append(info)
+        self.save_users()
+        return token, info
+
+    def list_tokens(self, username):
+        """A user's API tokens, without their hashes"""
+        user = self.users.get(username)
+        if not user:
+            return []
+        return [{k: v for k, v in t.items() if k != 'token_hash'} for t in user.api_tokens]
+
+    def revoke_token(self, username, token_id):
+        """Delete one of a user's API tokens; False if there is no such token"""
+        user = self.users.get(username)
+        if not user:
+            return False
+        for t in user.api_tokens:
+            if t['id'] == token_id:
+                user.api_tokens.remove(t)
+                self.token_cache.pop(t['token_hash'])
+                self.save_users()
+                return True
+        return False
+
+    def verify_token(self, token):
+        """Return the user an API token belongs to, or None"""
+        if not token or not token.startswith(TOKEN_PREFIX):
+            return None
+        token_hash = self._hash_token(token)
+        username = self.token_cache.get(token_hash)
+        if username is None:
+            username = self._find_token_owner(token_hash)
+            if username is None:
+                return None
+            self.token_cache.put(token_hash, username)
+        return self.get_user(username)
+
+    def _find_token_owner(self, token_hash):
+        return next((u.username for u in self.users.values()
+                     if any(hmac.compare_digest(t['token_hash'], token_hash)
+                            for t in u.api_tokens)), None)
+
     def get_user(self, username):
         """Get user by username"""
         return self.users.get(username)
     
+    def usernames(self):
+        """Usernames of all users"""
+        return list(self.users)
+
     def get_user_by_email(self, email):
         """Get user by email"""
         for user in self.users.values():
@@ -162,8 +424,10 @@ class UserManager:
             if os.path.exists(user_todo_file):
                 os.remove(user_todo_file)
             
-            # Remove user
+            # Remove user and anything cached for them
             del self.users[username]
+            self.token_cache.discard_value(username)
+            self.credential_cache.discard_value(username)
             self.save_users()
             return True
         return False
@@ -188,3 +452,282 @@ class UserManager:
             return f"./todo_{username}.txt"
         else:
             return full_path
+
+
+_USERS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username       TEXT NOT NULL,
+    email          TEXT NOT NULL,
+    password_hash  TEXT,
+    created_at     TEXT NOT NULL,
+    last_login     TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users (username);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email);
+
+CREATE TABLE IF NOT EXISTS api_tokens (
+    id          TEXT PRIMARY KEY,
+    username    TEXT NOT NULL REFERENCES users (username) ON DELETE CASCADE,
+    name        TEXT NOT NULL,
+    prefix      TEXT NOT NULL,
+    token_hash  TEXT NOT NULL UNIQUE,
+    created_at  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_api_tokens_username ON api_tokens (username);
+"""
+
+
+class SqliteUserManager(UserManager):
+    """Users, stored in users.db with unique indexes on username and email.
+
+    Lookups, registrations and token changes read or write only the rows
+    involved, so they cost the same at 100 accounts or 100k.  Logins are
+    buffered as in UserManager and written as row updates.  On first start
+    an existing users.json is imported and renamed to users.json.migrated.
+
+    Connections are kept in a small pool shared by all threads, so a
+    request thread reuses a warm connection rather than opening its own.
+    """
+
+    def __init__(self, db_file='users.db', users_file='users.json', todo_dir=None,
+                 flush_interval=None, pool_size=4):
+        self._db_file = db_file
+        self.pool_size = pool_size
+        self._idle = []
+        self._pool_lock = threading.Lock()
+        # username -> last_login not yet written
+        self._pending_logins = {}
+        super().__init__(users_file, todo_dir, flush_interval)
+
+    def _connect(self):
+        # Pooled connections move between threads; _db hands each to one at a time
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def _db(self):
+        """A pooled connection; commits on success, rolls back on error."""
+        with self._pool_lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            with self._pool_lock:
+                if len(self._idle) < self.pool_size:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    def load_users(self):
+        """Create the schema, importing users.json if it is still around"""
+        self.db_path = os.path.join(self.todo_dir, self._db_file)
+        with self._db() as conn:
+            # Persistent, so set once here rather than on every connection
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_USERS_SCHEMA)
+        if os.path.exists(self.users_file):
+            self._migrate_json()
+
+    def _migrate_json(self):
+        if self._import_json():
+            try:
+                os.replace(self.users_file, self.users_file + '.migrated')
+            except FileNotFoundError:
+                pass  # another worker finished the same import first
+
+    def _import_json(self):
+        # The write lock serialises workers starting at the same time
+        with self._db() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if not os.path.exists(self.users_file):
+                return False
+            try:
+                with open(self.users_file, 'r', encoding='utf-8') as f:
+                    users = [User.from_dict(u) for u in json.load(f).values()]
+            except (json.JSONDecodeError, KeyError, AttributeError):
+                # Left in place for someone to look at
+                return False
+            # Existing rows win, so a re-import never overwrites newer data
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (username, email, password_hash, created_at, last_login)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [(u.username, u.email, u.password_hash, u.created_at, u.last_login) for u in users],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO api_tokens (id, username, name, prefix, token_hash, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(t['id'], u.username, t['name'], t['prefix'], t['token_hash'], t['created_at'])
+                 for u in users for t in u.api_tokens],
+            )
+        return True
+
+    def save_users(self):
+        """Rows are written as they change; this writes buffered logins"""
+        self.flush()
+
+    def _record_login(self, user):
+        user.last_login = datetime.now().isoformat()
+        with self._lock:
+            self._pending_logins[user.username] = user.last_login
+        self._mark_dirty()
+
+    def flush(self):
+        """Write buffered last_login times as row updates."""
+        with self._lock:
+            pending, self._pending_logins = self._pending_logins, {}
+            self._dirty = False
+        if not pending:
+            return
+        try:
+            with self._db() as conn:
+                conn.executemany("UPDATE users SET last_login = ? WHERE username = ?",
+                                 [(ts, username) for username, ts in pending.items()])
+        except BaseException:
+            with self._lock:
+                for username, ts in pending.items():
+                    self._pending_logins.setdefault(username, ts)
+                self._dirty = True
+            raise
+        self.flushes += 1
+
+    def _row_user(self, row):
+        if row is None:
+            return None
+        user = User(row['username'], row['email'], row['password_hash'])
+        user.created_at = row['created_at']
+        with self._lock:
+            user.last_login = self._pending_logins.get(user.username, row['last_login'])
+        return user
+
+    def get_user(self, username):
+        """Get user by username"""
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        return self._row_user(row)
+
+    def get_user_by_email(self, email):
+        """Get user by email"""
+        with self._db() as conn:
+            row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+        return self._row_user(row)
+
+    def usernames(self):
+        """Usernames of all users"""
+        with self._db() as conn:
+            return [row[0] for row in conn.execute("SELECT username FROM users ORDER BY username")]
+
+    def create_user(self, username, email, password):
+        """Create a new user"""
+        error = self._validate_new_user(username, email, password)
+        if error:
+            return None, error
+        user = User(username, email)
+        user.set_password(password)
+        try:
+            with self._db() as conn:
+                conn.execute(
+                    "INSERT INTO users (username, email, password_hash, created_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (user.username, user.email, user.password_hash, user.created_at),
+                )
+        except sqlite3.IntegrityError as e:
+            # Registered by another request since the checks above
+            if 'email' in str(e):
+                return None, "Email already registered"
+            return None, "Username already exists"
+        return user, "User created successfully"
+
+    def delete_user(self, username):
+        """Delete a user, their API tokens and their todo file"""
+        with self._db() as conn:
+            deleted = conn.execute("DELETE FROM users WHERE username = ?", (username,)).rowcount
+        if not deleted:
+            return False
+        user_todo_file = self.get_user_todo_file(username)
+        if os.path.exists(user_todo_file):
+            os.remove(user_todo_file)
+        with self._lock:
+            self._pending_logins.pop(username, None)
+        self.token_cache.discard_value(username)
+        self.credential_cache.discard_value(username)
+        return True
+
+    def get_user_stats(self):
+        """Get statistics about users"""
+        with self._db() as conn:
+            total, with_login = conn.execute(
+                "SELECT count(*), count(last_login) FROM users").fetchone()
+            newest = conn.execute(
+                "SELECT username FROM users ORDER BY created_at DESC LIMIT 1").fetchone()
+        return {
+            'total_users': total,
+            'users_with_recent_login': with_login,
+            'newest_user': newest[0] if newest else None
+        }
+
+    def create_token(self, username, name):
+        """Create an API token for a user; return (token, info) or (None, error).
+
+        The token itself is only returned here; just its hash is stored.
+        """
+        if not self.get_user(username):
+            return None, "User not found"
+        token, info = self._new_token(name)
+        if token is None:
+            return None, info
+        with self._db() as conn:
+            conn.execute(
+                "INSERT INTO api_tokens (id, username, name, prefix, token_hash, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (info['id'], username, info['name'], info['prefix'], info['token_hash'],
+                 info['created_at']),
+            )
+        return token, info
+
+    def list_tokens(self, username):
+        """A user's API tokens, without their hashes"""
+        with self._db() as conn:
+            return [dict(row) for row in conn.execute(
+                "SELECT id, name, prefix, created_at FROM api_tokens WHERE username = ?"
+                " ORDER BY created_at", (username,))]
+
+    def revoke_token(self, username, token_id):
+        """Delete one of a user's API tokens; False if there is no such token"""
+        with self._db() as conn:
+            row = conn.execute("SELECT token_hash FROM api_tokens WHERE id = ? AND username = ?",
+                               (token_id, username)).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM api_tokens WHERE id = ?", (token_id,))
+        self.token_cache.pop(row['token_hash'])
+        return True
+
+    def _find_token_owner(self, token_hash):
+        with self._db() as conn:
+            row = conn.execute("SELECT username FROM api_tokens WHERE token_hash = ?",
+                               (token_hash,)).fetchone()
+        return row[0] if row else None
+
+
+def create_user_manager(store=None, todo_dir=None):
+    """Build the UserManager for a TODO_USER_STORE value: ``json`` or ``sqlite``.
+
+    json is the default; choosing sqlite imports users.json into users.db
+    once, after which users.json is no longer read.
+    """
+    store = (store if store is not None else os.environ.get('TODO_USER_STORE', 'json')).strip()
+    if store == 'sqlite':
+        return SqliteUserManager(todo_dir=todo_dir)
+    if store == 'json':
+        return UserManager(todo_dir=todo_dir)
+    raise ValueError(f"Unknown TODO_USER_STORE: {store!r}")